@@ -0,0 +1,126 @@
+import os
+import re
+import json
+import time
+import hashlib
+import sqlite3
+import logging
+import threading
+
+from storage import SQLiteConnection, LRUDict
+
+logger = logging.getLogger(__name__)
+
+# Cache settings
+ANALYSIS_CACHE_ENABLED = os.getenv('ANALYSIS_CACHE_ENABLED', 'true').lower() == 'true'
+ANALYSIS_CACHE_MAX_ENTRIES = int(os.getenv('ANALYSIS_CACHE_MAX_ENTRIES', '1024'))
+ANALYSIS_CACHE_TTL_SECONDS = float(os.getenv('ANALYSIS_CACHE_TTL_SECONDS', '86400'))
+# Set to e.g. instance/analysis_cache.sqlite3 to keep entries across restarts
+ANALYSIS_CACHE_PATH = os.getenv('ANALYSIS_CACHE_PATH', '')
+
+
+def normalize_text(text):
+    """Collapse whitespace so trivially different uploads share a cache key."""
+    return re.sub(r'\s+', ' ', text or '').strip()
+
+
+def make_cache_key(text, section_name, model, prompt_version):
+    """Build a content-addressed key for an analysis result."""
+    digest = hashlib.sha256()
+    for part in (prompt_version, model, section_name or '*', normalize_text(text)):
+        digest.update(str(part).encode('utf-8'))
+        digest.update(b'\0')
+    return digest.hexdigest()
+
+
+class AnalysisCache:
+    """LRU cache with TTL, optionally backed by a SQLite file.
+
+    The in-memory LRU is always consulted first; the SQLite table (when a
+    path is configured) holds entries that survive restarts and refills the
+    LRU on a hit.
+    """
+
+    def __init__(self, max_entries=ANALYSIS_CACHE_MAX_ENTRIES, ttl_seconds=ANALYSIS_CACHE_TTL_SECONDS,
+                 path=ANALYSIS_CACHE_PATH):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries = LRUDict(max_entries)
+        self._lock = threading.Lock()
+        self._stats = {'hits': 0, 'misses': 0, 'evictions': 0, 'expirations': 0}
+        self.path = path
+        self._db = SQLiteConnection(path) if path else None
+
+        if self._db is not None:
+            db = self._db.get()
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS analysis_cache ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL)"
+            )
+            db.execute("CREATE INDEX IF NOT EXISTS idx_analysis_cache_expires ON analysis_cache (expires_at)")
+            db.commit()
+
+    def get(self, key):
+        """Return the cached value for ``key`` or ``None``."""
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                value, expires_at = entry
+                if expires_at > now:
+                    self._entries.move_to_end(key)
+                    self._stats['hits'] += 1
+                    return value
+                del self._entries[key]
+                self._stats['expirations'] += 1
+
+            if self._db is not None:
+                row = self._db.get().execute(
+                    "SELECT value, expires_at FROM analysis_cache WHERE key = ? AND expires_at > ?",
+                    (key, now)
+                ).fetchone()
+                if row:
+                    value = json.loads(row[0])
+                    self._store_locked(key, value, row[1])
+                    self._stats['hits'] += 1
+                    return value
+
+            self._stats['misses'] += 1
+            return None
+
+    def set(self, key, value):
+        """Store a JSON-serializable ``value`` under ``key``."""
+        expires_at = time.time() + self.ttl_seconds
+        with self._lock:
+            self._store_locked(key, value, expires_at)
+            if self._db is not None:
+                try:
+                    db = self._db.get()
+                    db.execute(
+                        "INSERT OR REPLACE INTO analysis_cache (key, value, expires_at) VALUES (?, ?, ?)",
+                        (key, json.dumps(value), expires_at)
+                    )
+                    db.execute("DELETE FROM analysis_cache WHERE expires_at <= ?", (time.time(),))
+                    db.commit()
+                except sqlite3.Error as e:
+                    logger.error(f"Error writing analysis cache: {str(e)}")
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            if self._db is not None:
+                db = self._db.get()
+                db.execute("DELETE FROM analysis_cache")
+                db.commit()
+
+    def stats(self):
+        """Return hit, miss and eviction counters plus the current size."""
+        with self._lock:
+            stats = dict(self._stats)
+            stats['size'] = len(self._entries)
+            stats['max_entries'] = self.max_entries
+            stats['persistent'] = self._db is not None
+            return stats
+
+    def _store_locked(self, key, value, expires_at):
+        self._stats['evictions'] += self._entries.put(key, (value, expires_at))
@@ -1,128 +1,112 @@
 import os
-from flask import Flask, request, jsonify, render_template
-from flask_cors import CORS
 from dotenv import load_dotenv
-import tempfile
-import requests
+
+# Load environment variables first: the modules below read their settings at import time
+load_dotenv()
+
+from flask import Flask, Response, g, request, jsonify, render_template, url_for
+from flask_cors import CORS
+from werkzeug.middleware.proxy_fix import ProxyFix
 import logging
-import chardet
-import PyPDF2
-from io import BytesIO
 import re
 import json
-from docx import Document
+import math
+from datetime import datetime
+import time
+import queue
+import zipfile
+from concurrent.futures import ThreadPoolExecutor, wait
+from mistral_client import MistralClient, MistralError, CircuitOpenError
+from uploads import UploadRequest, detach_upload, upload_sha256
+from results import RESULT_STORE_ENABLED, RESULTS_PAGE_SIZE, ResultStore
+from lineage import LineageStore, valid_lineage_id
+from ratelimit import (RATE_LIMIT_ENABLED, LLM_RATE_PER_SECOND, LLM_BURST, make_store, TokenBucket,
+                       ClientRateLimiter)
+from analysis_cache import AnalysisCache, ANALYSIS_CACHE_ENABLED, make_cache_key
+from jobs import JobManager, JobQueueFull
+from segmenter import SectionSegmenter
+from keywords import KeywordMatcher
+from local_scoring import LocalScorer
+from extractors import extract_text
+from metrics import (registry, span, start_trace, finish_trace, propagate, fallback_total, structured_output_total,
+                     rate_limited_total, provisional_total)
+from planner import plan_calls, split_packed_response, trim_section
+from structured import (ANALYSIS_SCHEMA, AnalysisFormatError, parse_analysis, parse_packed_analyses,
+                        dump_analysis, build_repair_payload)
 
 # Configure logging
-logging.basicConfig(level=logging.DEBUG)
+logging.basicConfig(level=os.getenv('LOG_LEVEL', 'INFO').upper())
 logger = logging.getLogger(__name__)
 
-# Load environment variables
-load_dotenv()
-
 app = Flask(__name__)
+# Stream uploads into size-capped spools under instance/uploads
+app.request_class = UploadRequest
 CORS(app)
 
+# Number of reverse proxies (nginx, a load balancer) in front of the app. Their
+# X-Forwarded-For entries are trusted so rate limits see the real client IP.
+TRUSTED_PROXIES = int(os.getenv('TRUSTED_PROXIES', '0'))
+if TRUSTED_PROXIES:
+    app.wsgi_app = ProxyFix(app.wsgi_app, x_for=TRUSTED_PROXIES, x_proto=TRUSTED_PROXIES, x_host=TRUSTED_PROXIES)
+
+# Reject request bodies larger than this before they are read
+app.config['MAX_CONTENT_LENGTH'] = int(os.getenv('MAX_CONTENT_LENGTH', str(32 * 1024 * 1024)))
+
 # Configure Mistral.ai
 MISTRAL_API_KEY = os.getenv('MISTRAL_API_KEY')
-API_URL = "https://api.mistral.ai/v1/chat/completions"
-headers = {
-    "Authorization": f"Bearer {MISTRAL_API_KEY}",
-    "Content-Type": "application/json"
-}
-
-# Create uploads directory if it doesn't exist
-UPLOAD_FOLDER = 'instance/uploads'
-os.makedirs(UPLOAD_FOLDER, exist_ok=True)
-
-def extract_text_from_pdf(file):
-    """Extract text from PDF files."""
-    try:
-        # Read the file content
-        file.seek(0)
-        content = file.read()
-
-        # Extract text with PyPDF2
-        pdf_file = BytesIO(content)
-        pdf_reader = PyPDF2.PdfReader(pdf_file)
-
-        text = ""
-        for page_num in range(len(pdf_reader.pages)):
-            page_text = pdf_reader.pages[page_num].extract_text()
-            if page_text:
-                text += page_text + "\n\n"
-        
+MISTRAL_MODEL = os.getenv('MISTRAL_MODEL', 'mistral-tiny')
 
-        # Check if we got meaningful text
-        if len(text.strip()) < 100:
-            logger.warning("Minimal text extracted from PDF - might be scanned")
-            # Here you would add OCR handling, but we'll skip for now
+# Rate limiting: a global bucket for outbound Mistral calls and per-client
+# buckets for inbound analysis requests. Use the sqlite backend to share
+# the buckets between worker processes.
+rate_limit_store = make_store()
+llm_bucket = TokenBucket(rate_limit_store, 'llm:mistral', LLM_RATE_PER_SECOND, LLM_BURST)
+client_limiter = ClientRateLimiter(rate_limit_store)
+RATE_LIMITED_ENDPOINTS = {'analyze', 'analyze_batch', 'analyze_stream'}
 
-        if not text.strip():
-            raise ValueError("No text could be extracted from the PDF")
-            
-        return text
-    except Exception as e:
-        logger.error(f"Error reading PDF: {str(e)}")
-        raise
+mistral_client = MistralClient(MISTRAL_API_KEY, rate_limiter=llm_bucket if RATE_LIMIT_ENABLED else None)
+
+# Ask for JSON replies validated against a fixed schema instead of free text
+STRUCTURED_OUTPUT_ENABLED = os.getenv('STRUCTURED_OUTPUT_ENABLED', 'true').lower() == 'true'
+
+# Bump whenever a section prompt changes so stale cached analyses are not reused.
+# Streaming always uses the free-text prompt, so it is versioned separately.
+STREAM_PROMPT_VERSION = '1'
+PROMPT_VERSION = 'json-1' if STRUCTURED_OUTPUT_ENABLED else STREAM_PROMPT_VERSION
+analysis_cache = AnalysisCache()
+lineage_store = LineageStore()
+result_store = ResultStore() if RESULT_STORE_ENABLED else None
+section_segmenter = SectionSegmenter()
+keyword_matcher = KeywordMatcher()
+local_scorer = LocalScorer(keyword_matcher)
+
+# Response modes for analysis requests ('mode' query parameter): 'full' waits
+# for the LLM, 'provisional' returns only the local score, and 'both' returns
+# the local score at once and upgrades it with the LLM result in the background.
+ANALYSIS_MODES = ('full', 'provisional', 'both')
+
+# Section fan-out settings. The executor is shared by every request, so its
+# size doubles as the global cap on in-flight Mistral calls.
+ANALYZE_CONCURRENTLY = os.getenv('ANALYZE_CONCURRENTLY', 'true').lower() == 'true'
+MISTRAL_MAX_CONCURRENCY = int(os.getenv('MISTRAL_MAX_CONCURRENCY', '8'))
+ANALYSIS_DEADLINE_SECONDS = float(os.getenv('ANALYSIS_DEADLINE_SECONDS', '60'))
+# Completion token budget per analyzed section
+SECTION_MAX_TOKENS = int(os.getenv('SECTION_MAX_TOKENS', '500'))
+
+section_executor = ThreadPoolExecutor(
+    max_workers=MISTRAL_MAX_CONCURRENCY,
+    thread_name_prefix='mistral-section'
+)
 
-def extract_text_from_docx(file):
-    """Extract text from DOCX files."""
-    try:
-        # Read the file content
-        file.seek(0)
-        doc = Document(file)
-        
-        # Extract text from paragraphs
-        text = ""
-        for paragraph in doc.paragraphs:
-            if paragraph.text.strip():
-                text += paragraph.text + "\n\n"
-        
-        # Extract text from tables
-        for table in doc.tables:
-            for row in table.rows:
-                for cell in row.cells:
-                    if cell.text.strip():
-                        text += cell.text + "\n"
-                text += "\n"
-        
-        if not text.strip():
-            raise ValueError("No text could be extracted from the DOCX file")
-            
-        return text
-    except Exception as e:
-        logger.error(f"Error reading DOCX: {str(e)}")
-        raise
 
 def extract_text_from_file(file):
     """Extract text from various file formats."""
     try:
         logger.info(f"Extracting text from file: {file.filename}")
         
-        # Determine file type by extension
-        file_name = file.filename.lower()
-        
-        # Process with appropriate parser based on file type
-        if file_name.endswith('.pdf'):
-            logger.info("Using PDF-specific extraction")
-            return extract_text_from_pdf(file)
-        elif file_name.endswith('.docx'):
-            logger.info("Using DOCX-specific extraction")
-            return extract_text_from_docx(file)
-        else:
-            # For plain text files, try textract with encoding detection
-            file.seek(0)
-            content = file.read()
-            
-            # Try UTF-8 first
-            try:
-                text = content.decode('utf-8')
-            except UnicodeDecodeError:
-                # If UTF-8 fails, try to detect encoding
-                detected = chardet.detect(content)
-                encoding = detected['encoding'] if detected and detected['encoding'] else 'latin-1'
-                logger.debug(f"Detected encoding: {encoding}")
-                text = content.decode(encoding)
+        # Determine file type from its content and use the matching extractor
+        with span('extraction'):
+            text = extract_text(file)
         
         if not text.strip():
             raise ValueError("No text could be extracted from the file")
@@ -133,68 +117,161 @@ def extract_text_from_file(file):
         logger.error(f"Error extracting text: {str(e)}")
         raise
 
-def analyze_resume(text):
-    """Analyze resume using Mistral-7B-Instruct-v0.3 with chunked processing."""
+def analyze_resume(text, lineage_id=None):
+    """Analyze resume using Mistral-7B-Instruct-v0.3 with chunked processing.
+
+    With a ``lineage_id``, sections unchanged since that lineage's previous
+    revision reuse their earlier analyses and only changed sections are sent
+    to the LLM.
+    """
     try:
         logger.info("Preprocessing text for analysis")
-        
-        # Clean and normalize the text
-        text = text.strip()
-        # Remove excessive whitespace
-        text = re.sub(r'\s+', ' ', text)
-        # Remove special characters that might cause issues
-        text = re.sub(r'[^\w\s.,;:!?()\-]', '', text)
-        
-        # Split text into sections based on common resume headers
-        sections = {
-            'experience': extract_section(text, r'(?i)(experience|work history|employment)'),
-            'education': extract_section(text, r'(?i)(education|academic|degree)'),
-            'skills': extract_section(text, r'(?i)(skills|technical|proficient)'),
-            'projects': extract_section(text, r'(?i)(projects|portfolio|work samples)')
-        }
-        
-        # Analyze each section
-        section_analyses = {}
-        for section_name, section_text in sections.items():
-            if section_text:
-                section_analyses[section_name] = analyze_section(section_name, section_text)
+
+        # Segment the raw text so header lines are still recognizable
+        raw_text = text
+        text = clean_text(text)
+
+        cache_key = make_cache_key(text, None, MISTRAL_MODEL, PROMPT_VERSION)
+        # Lineage requests go through the section path so the lineage stays current
+        if ANALYSIS_CACHE_ENABLED and not lineage_id:
+            cached = analysis_cache.get(cache_key)
+            if cached is not None:
+                logger.info("Returning cached resume analysis")
+                return cached
+
+        sections = split_sections(raw_text)
+        expected = [name for name, section_text in sections.items() if section_text]
+
+        # Reuse the previous revision's results for sections whose content is unchanged
+        reused = {}
+        if lineage_id:
+            fingerprints = {
+                name: make_cache_key(sections[name], name, MISTRAL_MODEL, PROMPT_VERSION) for name in expected
+            }
+            previous = lineage_store.get(lineage_id)
+            reused = {
+                name: previous[name][1] for name in expected
+                if name in previous and previous[name][0] == fingerprints[name]
+            }
+            if reused:
+                logger.info(f"Reusing {', '.join(reused)} sections from lineage {lineage_id}")
+        pending = {name: section_text for name, section_text in sections.items() if name not in reused}
+
+        fresh = {}
+        if any(pending.values()):
+            # Skip straight to the local analyzer while Mistral is known to be down
+            if not mistral_client.available():
+                raise CircuitOpenError("Mistral circuit breaker is open")
+            # Analyze each changed section
+            fresh = analyze_sections(pending)
+        section_analyses = {name: reused[name] if name in reused else fresh.get(name) for name in expected}
+        if expected and not any(section_analyses.values()):
+            raise MistralError("No section analysis succeeded")
+
+        if lineage_id:
+            lineage_store.update(lineage_id, {
+                name: (fingerprints[name], section_analyses[name])
+                for name in expected if name not in reused and is_valid_analysis(section_analyses[name])
+            })
         
         # Combine analyses
-        combined_analysis = combine_analyses(section_analyses)
+        with span('parsing'):
+            combined_analysis = combine_analyses(section_analyses)
+
+        # Only cache complete, valid reports; degraded ones are retried on the next upload
+        if ANALYSIS_CACHE_ENABLED and all(is_valid_analysis(section_analyses.get(name)) for name in expected):
+            analysis_cache.set(cache_key, combined_analysis)
+
+        if lineage_id:
+            combined_analysis = dict(combined_analysis, lineage={
+                'id': lineage_id,
+                'reused_sections': list(reused),
+                'analyzed_sections': [name for name in expected if name not in reused]
+            })
         
         logger.info("Successfully analyzed resume")
         return combined_analysis
             
     except Exception as e:
         logger.error(f"Error in analysis: {str(e)}")
-        return perform_local_analysis(text)
+        fallback_total.inc()
+        with span('fallback'):
+            return perform_local_analysis(text)
 
-def extract_section(text, pattern):
-    """Extract a specific section from the resume text."""
-    try:
-        # Find the section header
-        match = re.search(pattern, text)
-        if not match:
-            return None
-            
-        start_idx = match.start()
-        # Find the next section or end of text
-        next_section = re.search(r'(?i)(experience|work history|employment|education|academic|degree|skills|technical|proficient|projects|portfolio|work samples)', text[start_idx + 1:])
-        
-        if next_section:
-            end_idx = start_idx + 1 + next_section.start()
-        else:
-            end_idx = len(text)
-            
-        return text[start_idx:end_idx].strip()
-    except Exception as e:
-        logger.error(f"Error extracting section: {str(e)}")
-        return None
+def clean_text(text):
+    """Clean and normalize extracted text before analysis."""
+    text = text.strip()
+    # Remove excessive whitespace
+    text = re.sub(r'\s+', ' ', text)
+    # Remove special characters that might cause issues
+    text = re.sub(r'[^\w\s.,;:!?()\-]', '', text)
+    return text
 
-def analyze_section(section_name, text):
-    """Analyze a specific section of the resume."""
-    try:
-        prompt = f"""<s>[INST] You are a professional resume analyst. Analyze this {section_name} section and provide feedback in this exact format:
+def split_sections(text):
+    """Split raw resume text into cleaned sections based on common resume headers."""
+    with span('segmentation'):
+        return {
+            section_name: clean_text(section_text) if section_text else None
+            for section_name, section_text in section_segmenter.segment(text).items()
+        }
+
+def analyze_sections(sections, deadline=None):
+    """Analyze all non-empty sections, fanning out concurrently when enabled.
+
+    The prompt planner groups sections into calls: oversized sections are
+    trimmed to the token budget and small ones share a multi-section call.
+    """
+    deadline = deadline or time.monotonic() + ANALYSIS_DEADLINE_SECONDS
+    pending = [name for name, text in sections.items() if text]
+    calls = plan_calls(sections)
+
+    results = {}
+    if not ANALYZE_CONCURRENTLY:
+        for call in calls:
+            if time.monotonic() >= deadline:
+                logger.warning(f"Analysis deadline reached before {', '.join(name for name, _ in call)} section")
+                break
+            results.update(analyze_call(call, deadline))
+    else:
+        futures = {section_executor.submit(propagate(analyze_call), call, deadline): call for call in calls}
+        done, not_done = wait(futures, timeout=max(0, deadline - time.monotonic()))
+
+        for future in not_done:
+            future.cancel()
+            logger.warning(f"Analysis deadline reached for {', '.join(name for name, _ in futures[future])} section")
+        for future in done:
+            results.update(future.result())
+
+    # Keep the original section order so the combined report stays stable
+    return {name: results[name] for name in pending if name in results}
+
+def analyze_call(call, deadline=None):
+    """Run one planned call and return its analyses keyed by section name."""
+    if len(call) == 1:
+        section_name, text = call[0]
+        return {section_name: analyze_section(section_name, text, deadline=deadline)}
+    return analyze_packed_sections(call, deadline=deadline)
+
+def build_section_payload(section_name, text, structured=None):
+    """Build the Mistral chat payload for one resume section."""
+    if structured is None:
+        structured = STRUCTURED_OUTPUT_ENABLED
+    if structured:
+        return build_structured_payload(f"""<s>[INST] You are a professional resume analyst. Analyze this {section_name} section and reply with a JSON object in exactly this shape:
+
+{ANALYSIS_SCHEMA}
+
+SECTION:
+{text}
+
+Important:
+1. Reply with the JSON object only
+2. Keep each point concise but complete
+3. Do not summarize the section
+4. Only provide analysis and feedback
+5. Speak in the second person[/INST]""", SECTION_MAX_TOKENS)
+
+    prompt = f"""<s>[INST] You are a professional resume analyst. Analyze this {section_name} section and provide feedback in this exact format:
 
 SECTION:
 {text}
@@ -213,28 +290,230 @@ Important:
 5. Speak in the second person
 6. Make sure to complete all recommendations without cutting off[/INST]"""
 
-        payload = {
-            "model": "mistral-tiny",
-            "messages": [
-                {"role": "user", "content": prompt}
-            ],
-            "temperature": 0.2,
-            "max_tokens": 500,
-            "top_p": 0.9
-        }
+    return {
+        "model": MISTRAL_MODEL,
+        "messages": [
+            {"role": "user", "content": prompt}
+        ],
+        "temperature": 0.2,
+        "max_tokens": SECTION_MAX_TOKENS,
+        "top_p": 0.9
+    }
 
-        response = requests.post(API_URL, headers=headers, json=payload)
-        
-        if response.status_code != 200:
-            return None
-            
-        result = response.json()["choices"][0]["message"]["content"]
-        return result.strip()
-        
+def build_structured_payload(prompt, max_tokens):
+    """Build a chat payload that asks Mistral for a JSON object reply."""
+    return {
+        "model": MISTRAL_MODEL,
+        "messages": [
+            {"role": "user", "content": prompt}
+        ],
+        "temperature": 0.2,
+        "max_tokens": max_tokens,
+        "top_p": 0.9,
+        "response_format": {"type": "json_object"}
+    }
+
+def build_packed_payload(sections):
+    """Build one Mistral chat payload that analyzes several small sections."""
+    section_blocks = "\n\n".join(f"### {section_name.upper()}\n{text}" for section_name, text in sections)
+    if STRUCTURED_OUTPUT_ENABLED:
+        keys = ", ".join(f'"{section_name}"' for section_name, _ in sections)
+        return build_structured_payload(f"""<s>[INST] You are a professional resume analyst. Analyze each of these resume sections separately and reply with one JSON object whose keys are {keys}. The value for each key must have exactly this shape:
+
+{ANALYSIS_SCHEMA}
+
+SECTIONS:
+{section_blocks}
+
+Important:
+1. Reply with the JSON object only
+2. Keep each point concise but complete
+3. Do not summarize the sections
+4. Only provide analysis and feedback
+5. Speak in the second person[/INST]""", SECTION_MAX_TOKENS * len(sections))
+
+    prompt = f"""<s>[INST] You are a professional resume analyst. Analyze each of these resume sections separately and provide feedback for every section in this exact format:
+
+### SECTION NAME
+Score (1-10): [number]
+Strengths: [2-3 specific points]
+Areas for Improvement: [2-3 specific points]
+Recommendations: [2-3 specific recommendations]
+
+SECTIONS:
+{section_blocks}
+
+Important:
+1. Start each section's feedback with its ### header exactly as shown above
+2. Keep each point concise but complete
+3. Do not summarize the sections
+4. Only provide analysis and feedback
+5. Speak in the second person
+6. Make sure to complete all recommendations without cutting off[/INST]"""
+
+    return {
+        "model": MISTRAL_MODEL,
+        "messages": [
+            {"role": "user", "content": prompt}
+        ],
+        "temperature": 0.2,
+        "max_tokens": SECTION_MAX_TOKENS * len(sections),
+        "top_p": 0.9
+    }
+
+def analyze_section(section_name, text, deadline=None):
+    """Analyze a specific section of the resume."""
+    try:
+        cache_key = make_cache_key(text, section_name, MISTRAL_MODEL, PROMPT_VERSION)
+        if ANALYSIS_CACHE_ENABLED:
+            cached = analysis_cache.get(cache_key)
+            if cached is not None:
+                return cached
+
+        payload = build_section_payload(section_name, text)
+        if STRUCTURED_OUTPUT_ENABLED:
+            analysis = request_structured(payload, parse_analysis, section_name, deadline)
+            result = dump_analysis(analysis) if isinstance(analysis, dict) else analysis
+        else:
+            with span('llm_call', section=section_name):
+                response = mistral_client.chat(payload, deadline=deadline)
+            result = response["choices"][0]["message"]["content"].strip()
+        if ANALYSIS_CACHE_ENABLED and is_valid_analysis(result):
+            analysis_cache.set(cache_key, result)
+        return result
+
+    except MistralError as e:
+        logger.error(f"Mistral request for {section_name} section failed: {str(e)}")
+        return None
     except Exception as e:
         logger.error(f"Error analyzing section: {str(e)}")
         return None
 
+def analyze_packed_sections(sections, deadline=None):
+    """Analyze several small sections with a single multi-section call."""
+    results = {}
+    uncached = []
+    for section_name, text in sections:
+        cached = None
+        if ANALYSIS_CACHE_ENABLED:
+            cached = analysis_cache.get(make_cache_key(text, section_name, MISTRAL_MODEL, PROMPT_VERSION))
+        if cached is not None:
+            results[section_name] = cached
+        else:
+            uncached.append((section_name, text))
+
+    if len(uncached) == 1:
+        section_name, text = uncached[0]
+        results[section_name] = analyze_section(section_name, text, deadline=deadline)
+        return results
+    if not uncached:
+        return results
+
+    names = [section_name for section_name, _ in uncached]
+    try:
+        payload = build_packed_payload(uncached)
+        if STRUCTURED_OUTPUT_ENABLED:
+            packed = request_structured(payload, lambda reply: parse_packed_analyses(reply, names),
+                                        '+'.join(names), deadline)
+            # An unusable packed reply leaves every section to be retried on its own
+            analyses = {name: dump_analysis(analysis) for name, analysis in packed.items()} if isinstance(packed, dict) else {}
+        else:
+            with span('llm_call', section='+'.join(names), packed=True):
+                response = mistral_client.chat(payload, deadline=deadline)
+            analyses = split_packed_response(response["choices"][0]["message"]["content"], names)
+    except MistralError as e:
+        logger.error(f"Mistral request for {', '.join(names)} sections failed: {str(e)}")
+        return dict(results, **{section_name: None for section_name in names})
+    except Exception as e:
+        logger.error(f"Error analyzing packed sections: {str(e)}")
+        analyses = {}
+
+    for section_name, text in uncached:
+        analysis = analyses.get(section_name)
+        if analysis:
+            if ANALYSIS_CACHE_ENABLED:
+                analysis_cache.set(make_cache_key(text, section_name, MISTRAL_MODEL, PROMPT_VERSION), analysis)
+            results[section_name] = analysis
+        else:
+            # The packed reply skipped this section; ask for it on its own
+            logger.warning(f"Packed reply missing {section_name} section; retrying individually")
+            results[section_name] = analyze_section(section_name, text, deadline=deadline)
+    return results
+
+def is_valid_analysis(analysis):
+    """Return True if a section analysis may be cached and reused.
+
+    With structured output that means it passed ``parse_analysis``; raw text
+    left over from a failed repair is used once and then retried.
+    """
+    if not analysis:
+        return False
+    if not STRUCTURED_OUTPUT_ENABLED:
+        return True
+    try:
+        parse_analysis(analysis)
+        return True
+    except AnalysisFormatError:
+        return False
+
+def request_structured(payload, parse, label, deadline=None):
+    """Request a JSON reply and return ``parse(reply)``, repairing invalid output once.
+
+    If the repaired reply is still invalid, the raw text is returned so the
+    caller can fall back to the regex parser.
+    """
+    with span('llm_call', section=label, structured=True):
+        response = mistral_client.chat(payload, deadline=deadline)
+    reply = response["choices"][0]["message"]["content"].strip()
+    try:
+        result = parse(reply)
+        structured_output_total.inc(outcome='valid')
+        return result
+    except AnalysisFormatError as e:
+        logger.warning(f"Invalid structured reply for {label}: {str(e)}; requesting a repair")
+        error = e
+
+    with span('llm_call', section=label, structured=True, repair=True):
+        response = mistral_client.chat(build_repair_payload(payload, reply, error), deadline=deadline)
+    repaired = response["choices"][0]["message"]["content"].strip()
+    try:
+        result = parse(repaired)
+        structured_output_total.inc(outcome='repaired')
+        return result
+    except AnalysisFormatError as e:
+        logger.warning(f"Repaired reply for {label} still invalid: {str(e)}")
+        structured_output_total.inc(outcome='fallback')
+        return repaired
+
+def stream_section(section_name, text, on_delta, deadline=None):
+    """Analyze a section with token streaming, passing each delta to ``on_delta``."""
+    try:
+        cache_key = make_cache_key(text, section_name, MISTRAL_MODEL, STREAM_PROMPT_VERSION)
+        if ANALYSIS_CACHE_ENABLED:
+            cached = analysis_cache.get(cache_key)
+            if cached is not None:
+                on_delta(cached)
+                return cached
+
+        payload = build_section_payload(section_name, text, structured=False)
+        parts = []
+        with span('llm_call', section=section_name, stream=True):
+            for delta in mistral_client.stream_chat(payload, deadline=deadline):
+                parts.append(delta)
+                on_delta(delta)
+
+        result = ''.join(parts).strip()
+        if ANALYSIS_CACHE_ENABLED and result:
+            analysis_cache.set(cache_key, result)
+        return result
+
+    except MistralError as e:
+        logger.error(f"Mistral stream for {section_name} section failed: {str(e)}")
+        return None
+    except Exception as e:
+        logger.error(f"Error streaming section: {str(e)}")
+        return None
+
 # def combine_analyses(section_analyses):
 #     """Combine analyses from different sections into a cohesive report."""
 #     try:
@@ -305,6 +584,44 @@ Important:
 #         logger.error(f"Error combining analyses: {str(e)}")
 #         return "Error combining analyses. Please try again."
 
+def parse_section_analysis(analysis):
+    """Parse one section's analysis into its structured fields.
+
+    Structured (JSON) analyses are validated directly; free-text replies fall
+    back to the regex patterns below.
+    """
+    if analysis.lstrip().startswith('{'):
+        try:
+            parsed = parse_analysis(analysis)
+            return {
+                "score": parsed["score"],
+                "strengths": "\n".join(parsed["strengths"]),
+                "improvements": "\n".join(parsed["improvements"]),
+                "recommendations": "\n".join(parsed["recommendations"])
+            }
+        except AnalysisFormatError:
+            pass
+
+    # Extract score
+    score_match = (
+        re.search(r'Score \(1-10\): (\d+)', analysis) or
+        re.search(r'SCORE: (\d+)', analysis) or
+        re.search(r'Score: (\d+)', analysis)
+    )
+    score = int(score_match.group(1)) if score_match else None
+
+    # Extract parts
+    strengths = re.search(r'Strengths:(.*?)(?=Areas for Improvement:|$)', analysis, re.DOTALL)
+    improvements = re.search(r'Areas for Improvement:(.*?)(?=Recommendations:|$)', analysis, re.DOTALL)
+    recommendations = re.search(r'Recommendations:(.*?)$', analysis, re.DOTALL)
+
+    return {
+        "score": score,
+        "strengths": strengths.group(1).strip() if strengths else "",
+        "improvements": improvements.group(1).strip() if improvements else "",
+        "recommendations": recommendations.group(1).strip() if recommendations else ""
+    }
+
 def combine_analyses(section_analyses):
     """Combine analyses from different sections into structured JSON."""
     try:
@@ -313,28 +630,11 @@ def combine_analyses(section_analyses):
 
         for section_name, analysis in section_analyses.items():
             if analysis:
-                # Extract score
-                score_match = (
-                    re.search(r'Score \(1-10\): (\d+)', analysis) or
-                    re.search(r'SCORE: (\d+)', analysis) or
-                    re.search(r'Score: (\d+)', analysis)
-                )
-                score = int(score_match.group(1)) if score_match else None
+                parsed_sections[section_name] = parse_section_analysis(analysis)
+                score = parsed_sections[section_name]["score"]
                 if score:
                     scores.append(score)
 
-                # Extract parts
-                strengths = re.search(r'Strengths:(.*?)(?=Areas for Improvement:|$)', analysis, re.DOTALL)
-                improvements = re.search(r'Areas for Improvement:(.*?)(?=Recommendations:|$)', analysis, re.DOTALL)
-                recommendations = re.search(r'Recommendations:(.*?)$', analysis, re.DOTALL)
-
-                parsed_sections[section_name] = {
-                    "score": score,
-                    "strengths": strengths.group(1).strip() if strengths else "",
-                    "improvements": improvements.group(1).strip() if improvements else "",
-                    "recommendations": recommendations.group(1).strip() if recommendations else ""
-                }
-
         overall_score = sum(scores) / len(scores) if scores else 0
 
         return {
@@ -351,202 +651,395 @@ def combine_analyses(section_analyses):
 
 
 def perform_local_analysis(text):
-    """Perform sophisticated local analysis of the resume."""
-    try:
-        # Define patterns for different sections and metrics
-        patterns = {
-            'experience': {
-                'section': r'(?i)(experience|work history|employment)',
-                'metrics': r'(?i)(achieved|increased|reduced|improved|led|managed|developed|implemented)',
-                'duration': r'(?i)(years?|months?|present|current)',
-                'role': r'(?i)(senior|junior|lead|manager|director|engineer|developer|analyst)'
-            },
-            'education': {
-                'section': r'(?i)(education|academic|degree|university|college)',
-                'metrics': r'(?i)(gpa|grade|honors?|dean\'s list|scholarship)',
-                'degree': r'(?i)(bachelor|master|phd|doctorate|bs|ms|ph\.d)',
-                'field': r'(?i)(computer science|engineering|mathematics|physics|business)'
-            },
-            'skills': {
-                'section': r'(?i)(skills|technical|proficient|expertise)',
-                'programming': r'(?i)(python|java|c\+\+|javascript|typescript|ruby|go|rust)',
-                'tools': r'(?i)(git|docker|kubernetes|aws|azure|gcp|jenkins)',
-                'frameworks': r'(?i)(react|angular|vue|django|flask|spring|node\.js)'
-            },
-            'projects': {
-                'section': r'(?i)(projects|portfolio|work samples)',
-                'metrics': r'(?i)(github|repository|demo|implementation|contribution)',
-                'impact': r'(?i)(users?|performance|efficiency|scalability|reliability)'
-            }
-        }
+    """Score the resume locally, in the same shape as ``combine_analyses``.
 
-        # Analyze each section
-        section_scores = {}
-        section_details = {}
-        
-        for section, section_patterns in patterns.items():
-            # Count section presence and content
-            section_count = len(re.findall(section_patterns['section'], text))
-            content_score = 0
-            details = []
-            
-            # Check for specific metrics and keywords
-            for metric, pattern in section_patterns.items():
-                if metric != 'section':  # Skip the section pattern itself
-                    matches = re.findall(pattern, text)
-                    if matches:
-                        content_score += len(matches)
-                        details.extend(matches)
-            
-            # Calculate section score (0-10)
-            base_score = min(10, section_count * 2)  # Base score for section presence
-            content_bonus = min(5, content_score / 2)  # Bonus for detailed content
-            section_scores[section] = base_score + content_bonus
-            section_details[section] = list(set(details))  # Remove duplicates
-
-        # Calculate overall score
-        overall_score = sum(section_scores.values()) / len(section_scores)
-        
-        # Generate detailed feedback
-        feedback = []
-        
-        # Experience feedback
-        exp_score = section_scores['experience']
-        exp_details = section_details['experience']
-        if exp_score >= 8:
-            feedback.append(f"Strong work experience section with {len(exp_details)} specific achievements and metrics.")
-        elif exp_score >= 5:
-            feedback.append(f"Good work experience section, but could benefit from more specific achievements and metrics.")
-        else:
-            feedback.append("Work experience section needs more detail about responsibilities and achievements.")
-        
-        # Education feedback
-        edu_score = section_scores['education']
-        edu_details = section_details['education']
-        if edu_score >= 8:
-            feedback.append(f"Comprehensive education section with {len(edu_details)} specific academic details.")
-        elif edu_score >= 5:
-            feedback.append("Education section is present but could include more details like GPA or coursework.")
-        else:
-            feedback.append("Education section needs more details about your academic background.")
-        
-        # Skills feedback
-        skills_score = section_scores['skills']
-        skills_details = section_details['skills']
-        if skills_score >= 8:
-            feedback.append(f"Well-organized skills section with {len(skills_details)} specific technical competencies.")
-        elif skills_score >= 5:
-            feedback.append("Skills section is present but could be more specific about technical abilities.")
-        else:
-            feedback.append("Skills section needs more specific technical skills and tools.")
-        
-        # Projects feedback
-        proj_score = section_scores['projects']
-        proj_details = section_details['projects']
-        if proj_score >= 8:
-            feedback.append(f"Strong projects section with {len(proj_details)} specific demonstrations of your work.")
-        elif proj_score >= 5:
-            feedback.append("Projects section is present but could include more details about your contributions.")
-        else:
-            feedback.append("Projects section needs more details about your role and contributions.")
-        
-        # Generate specific recommendations based on analysis
-        recommendations = []
-        
-        # Experience recommendations
-        if exp_score < 8:
-            if len(exp_details) < 3:
-                recommendations.append("Enhance work experience with specific achievements like: 'Led team of 5 developers to complete project 2 weeks ahead of schedule', 'Implemented automation that reduced processing time by 60%', 'Increased customer satisfaction scores from 75% to 92%'")
-            if not any('led' in detail.lower() or 'managed' in detail.lower() for detail in exp_details):
-                recommendations.append("Showcase leadership by adding: 'Managed cross-functional team of 8 members', 'Led daily standups and sprint planning', 'Mentored 3 junior developers'")
-            if not any('metric' in detail.lower() or '%' in detail or '$' in detail for detail in exp_details):
-                recommendations.append("Add quantifiable metrics: 'Reduced server costs by $15K annually', 'Improved application performance by 45%', 'Increased user engagement by 30%'")
-        
-        # Education recommendations
-        if edu_score < 8:
-            if not any('gpa' in detail.lower() for detail in edu_details):
-                recommendations.append("Include academic achievements: 'GPA: 3.8/4.0', 'Dean's List 2020-2022', 'Summa Cum Laude'")
-            if len(edu_details) < 2:
-                recommendations.append("Add academic highlights: 'Relevant Coursework: Data Structures, Algorithms, Machine Learning', 'Senior Project: Developed AI-powered resume analyzer', 'Research Assistant: Published paper on NLP techniques'")
-            if not any('honor' in detail.lower() or 'scholarship' in detail.lower() for detail in edu_details):
-                recommendations.append("Highlight academic recognition: 'Recipient of Computer Science Excellence Scholarship', 'National Merit Scholar', 'Departmental Honors'")
-        
-        # Skills recommendations
-        if skills_score < 8:
-            if len(skills_details) < 5:
-                recommendations.append("Expand technical skills with specific examples: 'Programming: Python (5+ years), Java, JavaScript', 'Cloud: AWS (EC2, S3, Lambda), Azure', 'DevOps: Docker, Kubernetes, Jenkins'")
-            if not any('framework' in detail.lower() for detail in skills_details):
-                recommendations.append("Add framework expertise: 'Web: React, Angular, Vue.js', 'Backend: Django, Flask, Spring Boot', 'Mobile: React Native, Flutter'")
-            if not any('tool' in detail.lower() or 'platform' in detail.lower() for detail in skills_details):
-                recommendations.append("Include development tools: 'Version Control: Git, GitHub, Bitbucket', 'CI/CD: Jenkins, GitHub Actions', 'Testing: JUnit, Selenium, PyTest'")
-        
-        # Projects recommendations
-        if proj_score < 8:
-            if len(proj_details) < 2:
-                recommendations.append("Add detailed project descriptions: 'Developed full-stack e-commerce platform using React and Node.js', 'Built machine learning model for fraud detection with 95% accuracy', 'Created automated testing framework reducing QA time by 50%'")
-            if not any('impact' in detail.lower() for detail in proj_details):
-                recommendations.append("Showcase project impact: 'Deployed to production serving 10K+ users', 'Reduced server response time from 2s to 200ms', 'Implemented features increasing user retention by 25%'")
-            if not any('contribution' in detail.lower() or 'role' in detail.lower() for detail in proj_details):
-                recommendations.append("Highlight your role: 'Led backend development and database optimization', 'Implemented RESTful API endpoints', 'Designed and developed user authentication system'")
-        
-        # Format the response
-        response = f"""Score: {overall_score:.1f}/10
-
-Detailed Analysis:
-{chr(10).join(f'- {item}' for item in feedback)}
-
-Section Scores:
-- Experience: {section_scores['experience']:.1f}/10
-- Education: {section_scores['education']:.1f}/10
-- Skills: {section_scores['skills']:.1f}/10
-- Projects: {section_scores['projects']:.1f}/10
-
-Recommendations:
-{chr(10).join(f'{i+1}. {rec}' for i, rec in enumerate(recommendations[:5]))}
-
-Additional Tips:
-- Use action verbs: 'Led', 'Developed', 'Implemented', 'Optimized', 'Designed'
-- Include specific numbers and metrics whenever possible
-- Focus on results and impact rather than just responsibilities
-- Tailor content to the job you're applying for
-- Keep descriptions concise but informative"""
-        
-        return response
+    The text is cleaned here so every caller scores the same input.
+    """
+    return local_scorer.score(clean_text(text))
+
+def record_result(document_sha256, filename, analysis, lineage_id=None):
+    """Save a finished analysis to the result store and return its id, if enabled."""
+    if result_store is None:
+        return None
+    try:
+        return result_store.record(document_sha256, analysis, filename=filename, lineage_id=lineage_id)
     except Exception as e:
-        logger.error(f"Error in local analysis: {str(e)}")
-        return "Unable to analyze resume at this time. Please try again later."
+        logger.error(f"Error recording analysis result: {str(e)}")
+        return None
+
+def run_analysis_job(upload, lineage_id=None, text=None):
+    """Extract and analyze a spooled upload on a background worker.
+
+    ``text`` skips extraction when the request already extracted it.
+    """
+    try:
+        if text is None:
+            text = extract_text_from_file(upload)
+        analysis = analyze_resume(text, lineage_id=lineage_id)
+        record_result(upload_sha256(upload), upload.filename, analysis, lineage_id)
+        return analysis
+    finally:
+        upload.close()
+
+job_manager = JobManager(run_analysis_job)
+
+def drain(timeout=None):
+    """Stop taking background jobs and wait up to ``timeout`` seconds for in-flight ones."""
+    logger.info("Draining background analysis jobs")
+    finished = job_manager.shutdown(timeout)
+    section_executor.shutdown(wait=finished)
+    return finished
+
+def collect_app_metrics():
+    """Expose cache, Mistral client and job queue counters at scrape time."""
+    cache = analysis_cache.stats()
+    usage = mistral_client.usage()
+    breaker = mistral_client.breaker.stats()
+    jobs = job_manager.stats()
+    return [
+        ('resume_analyzer_cache_hits_total', 'counter', 'Analysis cache hits.', [({}, cache['hits'])]),
+        ('resume_analyzer_cache_misses_total', 'counter', 'Analysis cache misses.', [({}, cache['misses'])]),
+        ('resume_analyzer_cache_evictions_total', 'counter', 'Analysis cache LRU evictions.', [({}, cache['evictions'])]),
+        ('resume_analyzer_cache_entries', 'gauge', 'Entries in the in-memory analysis cache.', [({}, cache['size'])]),
+        ('resume_analyzer_mistral_requests_total', 'counter', 'HTTP requests sent to Mistral, including retries.', [({}, usage['requests'])]),
+        ('resume_analyzer_mistral_retries_total', 'counter', 'Mistral requests retried after a failure.', [({}, usage['retries'])]),
+        ('resume_analyzer_mistral_failures_total', 'counter', 'Mistral calls that failed after retries.', [({}, usage['failures'])]),
+        ('resume_analyzer_mistral_hedges_total', 'counter', 'Duplicate Mistral requests sent to cut tail latency.', [({}, usage['hedges'])]),
+        ('resume_analyzer_mistral_rejected_total', 'counter', 'Mistral calls failed fast by the open circuit breaker.', [({}, usage['rejected'])]),
+        ('resume_analyzer_mistral_throttled_total', 'counter', 'Mistral calls refused by the outbound rate limit.', [({}, usage['throttled'])]),
+        ('resume_analyzer_mistral_circuit_open', 'gauge', 'Mistral circuit breaker state (0 closed, 0.5 half-open, 1 open).', [
+            ({}, {'closed': 0, 'half_open': 0.5, 'open': 1}[breaker['state']])
+        ]),
+        ('resume_analyzer_mistral_tokens_total', 'counter', 'Tokens consumed by Mistral calls.', [
+            ({'kind': 'prompt'}, usage['prompt_tokens']),
+            ({'kind': 'completion'}, usage['completion_tokens'])
+        ]),
+        ('resume_analyzer_job_queue_depth', 'gauge', 'Jobs waiting for a worker.', [({}, jobs['queue_depth'])])
+    ]
+
+registry.register_collector(collect_app_metrics)
+
+@app.before_request
+def begin_request_trace():
+    g.trace_token = start_trace(request.endpoint or 'unknown')
+
+def rate_limit_client_id():
+    """Bucket id for the caller: its API key when the key is configured, otherwise its IP."""
+    return client_limiter.client_id(request.headers.get('X-API-Key'), request.remote_addr)
+
+@app.before_request
+def limit_client_rate():
+    """Reject over-quota clients before the upload is read."""
+    if not RATE_LIMIT_ENABLED or request.endpoint not in RATE_LIMITED_ENDPOINTS:
+        return None
+    allowed, retry_after = client_limiter.check(rate_limit_client_id())
+    if allowed:
+        return None
+    rate_limited_total.inc(scope='client')
+    return jsonify({'error': 'Rate limit exceeded. Please try again shortly.'}), 429, {
+        'Retry-After': str(max(1, math.ceil(retry_after)))
+    }
+
+@app.after_request
+def end_request_trace(response):
+    token = g.pop('trace_token', None)
+    if token is not None:
+        finish_trace(token, response.status_code)
+    return response
+
+@app.teardown_request
+def abandon_request_trace(error=None):
+    token = g.pop('trace_token', None)
+    if token is not None:
+        finish_trace(token, 500)
+
+@app.errorhandler(413)
+def request_too_large(error):
+    return jsonify({'error': 'Upload too large.', 'detail': error.description}), 413
+
+@app.route('/metrics')
+def metrics():
+    return Response(registry.render(), mimetype='text/plain; version=0.0.4')
 
 @app.route('/')
 def index():
     return render_template('index.html')
 
+@app.route('/api/cache/stats')
+def cache_stats():
+    return jsonify(analysis_cache.stats())
+
 @app.route('/api/analyze', methods=['POST'])
 def analyze():
     logger.info("Received analyze request")
-    if 'file' not in request.files:
+    with span('upload'):
+        files = request.files
+    if 'file' not in files:
         logger.error("No file provided in request")
         return jsonify({'error': 'No file provided'}), 400
     
-    file = request.files['file']
+    file = files['file']
     if file.filename == '':
         logger.error("Empty filename provided")
         return jsonify({'error': 'No file selected'}), 400
 
+    # Optional candidate/document id; revisions with the same id only re-analyze changed sections
+    lineage_id = request.form.get('lineage_id') or request.headers.get('X-Lineage-Id')
+    if lineage_id is not None and not valid_lineage_id(lineage_id):
+        return jsonify({'error': 'Invalid lineage_id'}), 400
+
+    mode = request.args.get('mode', 'full')
+    if mode not in ANALYSIS_MODES:
+        return jsonify({'error': f"Invalid mode; expected one of {', '.join(ANALYSIS_MODES)}"}), 400
+
+    if mode == 'full' and request.args.get('async', '').lower() in ('1', 'true'):
+        try:
+            job_id = job_manager.submit(detach_upload(file), lineage_id,
+                                        on_discard=lambda upload, lineage_id: upload.close())
+        except JobQueueFull:
+            logger.warning("Rejecting analyze request: job queue is full")
+            return jsonify({'error': 'The server is busy. Please try again shortly.'}), 429, {'Retry-After': '5'}
+
+        logger.info(f"Queued file {file.filename} as job {job_id}")
+        return jsonify({
+            'job_id': job_id,
+            'status': 'queued',
+            'status_url': url_for('get_job', job_id=job_id)
+        }), 202
+
     logger.info(f"Processing file: {file.filename}")
     try:
         text = extract_text_from_file(file)
-        analysis = analyze_resume(text)
+        if mode != 'full':
+            return provisional_response(file, text, mode, lineage_id)
+
+        analysis = analyze_resume(text, lineage_id=lineage_id)
         logger.info("Analysis complete")
-        print("=== Data Sent to Frontend ===")
-        print(analysis) 
 
+        result_id = record_result(upload_sha256(file), file.filename, analysis, lineage_id)
+        return jsonify(analysis), 200, {'X-Result-Id': str(result_id)} if result_id else {}
+    except Exception as e:
+        logger.error(f"Error processing file: {str(e)}")
+        return jsonify({
+            'error': 'Failed to process the file. Please make sure it is a valid PDF, DOCX, or TXT file and try again.'
+        }), 400
+
+def provisional_response(file, text, mode, lineage_id=None):
+    """Answer with the local score; in 'both' mode also queue the LLM analysis as a job."""
+    analysis = provisional_analysis(text, mode)
+    if mode == 'provisional':
+        return jsonify(analysis)
+
+    try:
+        job_id = job_manager.submit(detach_upload(file), lineage_id, text,
+                                    on_discard=lambda upload, *args: upload.close())
+    except JobQueueFull:
+        # The local score is still a usable answer; it just will not be upgraded
+        logger.warning("Job queue is full; returning the provisional analysis only")
         return jsonify(analysis)
+
+    logger.info(f"Returned provisional analysis for {file.filename}; full analysis queued as job {job_id}")
+    return jsonify(dict(analysis, job_id=job_id, status_url=url_for('get_job', job_id=job_id))), 202
+
+@app.route('/api/analyze/batch', methods=['POST'])
+def analyze_batch():
+    # Imported here because batch imports the analysis helpers from this module
+    from batch import (BatchLimitError, DocumentSpool, iter_upload_documents, limit_documents, record_batch_results,
+                       run_batch)
+
+    uploads = request.files.getlist('files') + request.files.getlist('file')
+    uploads = [upload for upload in uploads if upload.filename]
+    if not uploads:
+        logger.error("No files provided in batch request")
+        return jsonify({'error': 'No files provided'}), 400
+
+    # Copy everything to disk before streaming starts; the request body is gone afterwards
+    spool = DocumentSpool()
+    try:
+        documents = list(limit_documents(iter_upload_documents(uploads, spool)))
+    except (BatchLimitError, zipfile.BadZipFile) as e:
+        spool.close()
+        logger.error(f"Rejected batch request: {str(e)}")
+        return jsonify({'error': str(e)}), 400
+
+    # Admission paid for one document; the rest are charged now, so a large
+    # batch leaves the client's bucket in debt and its next requests wait
+    if RATE_LIMIT_ENABLED:
+        client_limiter.charge(rate_limit_client_id(), len(documents) - 1)
+
+    local_only = request.args.get('mode') == 'local'
+    logger.info(f"Processing batch of {len(documents)} documents")
+
+    def generate():
+        try:
+            for record in record_batch_results(run_batch(documents, local_only=local_only)):
+                yield json.dumps(record) + '\n'
+        finally:
+            spool.close()
+
+    return Response(generate(), mimetype='application/x-ndjson')
+
+def provisional_analysis(text, mode):
+    """Score ``text`` locally and mark the result as provisional."""
+    provisional_total.inc(mode=mode)
+    with span('provisional'):
+        return dict(perform_local_analysis(text), provisional=True)
+
+def sse_event(event, data):
+    """Format a Server-Sent Events message with a JSON payload."""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+@app.route('/api/analyze/stream', methods=['POST'])
+def analyze_stream():
+    logger.info("Received streaming analyze request")
+    if 'file' not in request.files:
+        logger.error("No file provided in request")
+        return jsonify({'error': 'No file provided'}), 400
+
+    file = request.files['file']
+    if file.filename == '':
+        logger.error("Empty filename provided")
+        return jsonify({'error': 'No file selected'}), 400
+
+    mode = request.args.get('mode', 'full')
+    if mode not in ANALYSIS_MODES:
+        return jsonify({'error': f"Invalid mode; expected one of {', '.join(ANALYSIS_MODES)}"}), 400
+
+    try:
+        text = extract_text_from_file(file)
     except Exception as e:
         logger.error(f"Error processing file: {str(e)}")
         return jsonify({
             'error': 'Failed to process the file. Please make sure it is a valid PDF, DOCX, or TXT file and try again.'
         }), 400
 
+    provisional = provisional_analysis(text, mode) if mode != 'full' else None
+    if mode == 'provisional':
+        return Response(sse_event('provisional', provisional), mimetype='text/event-stream', headers={
+            'Cache-Control': 'no-cache',
+            'X-Accel-Buffering': 'no'
+        })
+
+    document_sha256 = upload_sha256(file)
+    pending = {name: trim_section(section_text) for name, section_text in split_sections(text).items() if section_text}
+    # Skip straight to the local analyzer while Mistral is known to be down
+    if pending and not mistral_client.available():
+        logger.warning("Mistral circuit breaker is open; streaming the local analysis")
+        pending = {}
+    deadline = time.monotonic() + ANALYSIS_DEADLINE_SECONDS
+    events = queue.Queue()
+
+    def run_section(section_name, section_text):
+        on_delta = lambda delta: events.put(('delta', section_name, delta))
+        result = stream_section(section_name, section_text, on_delta, deadline=deadline)
+        events.put(('section', section_name, result))
+
+    for section_name, section_text in pending.items():
+        section_executor.submit(propagate(run_section), section_name, section_text)
+
+    def generate():
+        if provisional is not None:
+            yield sse_event('provisional', provisional)
+
+        section_analyses = {}
+        remaining = len(pending)
+        while remaining:
+            try:
+                kind, section_name, value = events.get(timeout=max(0, deadline - time.monotonic()))
+            except queue.Empty:
+                logger.warning("Analysis deadline reached while streaming")
+                yield sse_event('error', {'error': 'Analysis deadline reached'})
+                break
+
+            if kind == 'delta':
+                yield sse_event('delta', {'section': section_name, 'text': value})
+                continue
+
+            remaining -= 1
+            if value:
+                section_analyses[section_name] = value
+                yield sse_event('section', {'section': section_name, 'analysis': parse_section_analysis(value)})
+            else:
+                yield sse_event('section_error', {'section': section_name})
+
+        if section_analyses:
+            # Report sections in resume order rather than completion order
+            ordered = {name: section_analyses[name] for name in pending if name in section_analyses}
+            analysis = combine_analyses(ordered)
+        else:
+            fallback_total.inc()
+            with span('fallback'):
+                analysis = perform_local_analysis(text)
+
+        result_id = record_result(document_sha256, file.filename, analysis)
+        yield sse_event('complete', dict(analysis, result_id=result_id) if result_id else analysis)
+
+    return Response(generate(), mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no'
+    })
+
+@app.route('/api/jobs/<job_id>')
+def get_job(job_id):
+    job = job_manager.get(job_id)
+    if job is None:
+        return jsonify({'error': 'Job not found'}), 404
+
+    response = {'job_id': job['id'], 'status': job['status']}
+    if job['status'] == 'done':
+        response['result'] = job['result']
+    elif job['status'] == 'failed':
+        response['error'] = 'Failed to process the file. Please make sure it is a valid PDF, DOCX, or TXT file and try again.'
+    return jsonify(response)
+
+@app.route('/api/jobs/stats')
+def job_stats():
+    return jsonify(job_manager.stats())
+
+def parse_timestamp(value):
+    """Parse a Unix timestamp or an ISO 8601 date/time (UTC unless an offset is given)."""
+    try:
+        return float(value)
+    except ValueError:
+        parsed = datetime.fromisoformat(value)
+        if parsed.tzinfo is None:
+            return (parsed - datetime(1970, 1, 1)).total_seconds()
+        return parsed.timestamp()
+
+@app.route('/api/results')
+def list_results():
+    if result_store is None:
+        return jsonify({'error': 'Result store is disabled'}), 404
+    args = request.args
+    try:
+        page = result_store.query(
+            min_score=args.get('min_score', type=float),
+            max_score=args.get('max_score', type=float),
+            since=parse_timestamp(args['since']) if 'since' in args else None,
+            until=parse_timestamp(args['until']) if 'until' in args else None,
+            document_sha256=args.get('sha256'),
+            lineage_id=args.get('lineage_id'),
+            section=args.get('section'),
+            section_min=args.get('section_min', type=float),
+            section_max=args.get('section_max', type=float),
+            cursor=args.get('cursor', type=int),
+            limit=args.get('limit', RESULTS_PAGE_SIZE, type=int)
+        )
+    except ValueError as e:
+        return jsonify({'error': f'Invalid query parameter: {str(e)}'}), 400
+
+    if page['next_cursor'] is not None:
+        page['next_url'] = url_for('list_results', **dict(args.items(), cursor=page['next_cursor']))
+    return jsonify(page)
+
+@app.route('/api/results/<int:result_id>')
+def get_result(result_id):
+    record = result_store.get(result_id) if result_store is not None else None
+    if record is None:
+        return jsonify({'error': 'Result not found'}), 404
+    return jsonify(record)
+
 if __name__ == '__main__':
     logger.info("Starting Flask application")
-    app.run(debug=True) 
\ No newline at end of file
+    # The development server only; use gunicorn with gunicorn.conf.py in production
+    app.run(debug=os.getenv('FLASK_DEBUG', 'false').lower() == 'true')
@@ -0,0 +1,264 @@
+import os
+import sys
+import json
+import queue
+import shutil
+import hashlib
+import zipfile
+import argparse
+import logging
+import tempfile
+import threading
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from werkzeug.datastructures import FileStorage
+
+from app import extract_text_from_file, analyze_resume, perform_local_analysis, record_result
+from analysis_cache import normalize_text
+from uploads import UPLOAD_FOLDER, COPY_CHUNK_SIZE
+
+logger = logging.getLogger(__name__)
+
+# Batch settings
+BATCH_EXTRACT_WORKERS = int(os.getenv('BATCH_EXTRACT_WORKERS', str(os.cpu_count() or 2)))
+BATCH_ANALYZE_WORKERS = int(os.getenv('BATCH_ANALYZE_WORKERS', '4'))
+BATCH_MAX_FILES = int(os.getenv('BATCH_MAX_FILES', '500'))
+BATCH_MAX_FILE_BYTES = int(os.getenv('BATCH_MAX_FILE_BYTES', str(10 * 1024 * 1024)))
+# Uncompressed bytes spooled to disk for one batch, counted while reading
+BATCH_MAX_TOTAL_BYTES = int(os.getenv('BATCH_MAX_TOTAL_BYTES', str(256 * 1024 * 1024)))
+
+SUPPORTED_EXTENSIONS = ('.pdf', '.docx', '.txt', '.rtf', '.odt', '.html', '.htm')
+
+
+_extract_pool = None
+_extract_pool_lock = threading.Lock()
+
+
+class BatchLimitError(ValueError):
+    """Raised when a batch exceeds the configured file count or size limits."""
+
+
+class DocumentSpool:
+    """Temporary directory that batch documents are copied into instead of memory.
+
+    Sizes are counted while copying, so zip headers claiming small members
+    cannot get past ``max_file_bytes`` or ``max_total_bytes``.
+    """
+
+    def __init__(self, max_file_bytes=BATCH_MAX_FILE_BYTES, max_total_bytes=BATCH_MAX_TOTAL_BYTES, dir=UPLOAD_FOLDER):
+        self.max_file_bytes = max_file_bytes
+        self.max_total_bytes = max_total_bytes
+        self.total_bytes = 0
+        self.directory = tempfile.mkdtemp(prefix='batch-', dir=dir)
+        self._count = 0
+
+    def add(self, name, source):
+        """Copy the ``source`` stream to disk and return the new file's path."""
+        self._count += 1
+        path = os.path.join(self.directory, str(self._count))
+        size = 0
+        with open(path, 'wb') as f:
+            for chunk in iter(lambda: source.read(COPY_CHUNK_SIZE), b''):
+                size += len(chunk)
+                self.total_bytes += len(chunk)
+                if size > self.max_file_bytes:
+                    raise BatchLimitError(f"{name} exceeds the {self.max_file_bytes} byte limit")
+                if self.total_bytes > self.max_total_bytes:
+                    raise BatchLimitError(f"Batch exceeds the {self.max_total_bytes} byte limit")
+                f.write(chunk)
+        return path
+
+    def close(self):
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def get_extract_pool():
+    """Return the extraction process pool shared by every batch request."""
+    global _extract_pool
+    with _extract_pool_lock:
+        if _extract_pool is None:
+            _extract_pool = ProcessPoolExecutor(max_workers=BATCH_EXTRACT_WORKERS)
+        return _extract_pool
+
+
+def extract_document(filename, path):
+    """Extract text from a document on disk. Runs inside the extraction process pool."""
+    with open(path, 'rb') as f:
+        return extract_text_from_file(FileStorage(stream=f, filename=filename))
+
+
+def file_sha256(path):
+    """Return the hex SHA-256 of the file at ``path``."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(COPY_CHUNK_SIZE), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def iter_zip_documents(source, spool, prefix=''):
+    """Yield ``(name, path)`` for each supported document inside a zip archive, copied into ``spool``."""
+    with zipfile.ZipFile(source) as archive:
+        for info in archive.infolist():
+            if info.is_dir() or not info.filename.lower().endswith(SUPPORTED_EXTENSIONS):
+                continue
+            if info.file_size > spool.max_file_bytes:
+                raise BatchLimitError(f"{info.filename} exceeds the {spool.max_file_bytes} byte limit")
+            with archive.open(info) as member:
+                yield prefix + info.filename, spool.add(prefix + info.filename, member)
+
+
+def iter_directory_documents(directory, spool):
+    """Yield ``(name, path)`` for each supported document under ``directory``.
+
+    Plain files are used in place; zip members are copied into ``spool``.
+    """
+    for root, _, filenames in os.walk(directory):
+        for filename in sorted(filenames):
+            path = os.path.join(root, filename)
+            name = os.path.relpath(path, directory)
+            if filename.lower().endswith('.zip'):
+                yield from iter_zip_documents(path, spool, prefix=name + '/')
+            elif filename.lower().endswith(SUPPORTED_EXTENSIONS):
+                if os.path.getsize(path) > BATCH_MAX_FILE_BYTES:
+                    raise BatchLimitError(f"{name} exceeds the {BATCH_MAX_FILE_BYTES} byte limit")
+                yield name, path
+
+
+def iter_upload_documents(uploads, spool):
+    """Yield ``(name, path)`` for uploaded files, copied into ``spool`` with zip archives expanded."""
+    for upload in uploads:
+        if upload.filename.lower().endswith('.zip'):
+            yield from iter_zip_documents(upload.stream, spool, prefix=upload.filename + '/')
+        else:
+            yield upload.filename, spool.add(upload.filename, upload.stream)
+
+
+def limit_documents(documents, max_files=BATCH_MAX_FILES):
+    """Pass documents through, raising once more than ``max_files`` are seen."""
+    for count, document in enumerate(documents, start=1):
+        if count > max_files:
+            raise BatchLimitError(f"Batch exceeds the {max_files} file limit")
+        yield document
+
+
+def run_batch(documents, local_only=False, extract_pool=None, analyze_workers=BATCH_ANALYZE_WORKERS):
+    """Analyze ``(name, path)`` documents and yield one record per document as it finishes.
+
+    Text extraction runs in ``extract_pool``, by default the process pool
+    shared by all batches. Byte-identical uploads and documents
+    whose extracted text is identical are analyzed once and reported with
+    ``duplicate_of``. LLM calls go through ``analyze_resume`` and therefore share
+    the application's global Mistral concurrency cap.
+    """
+    analyze = perform_local_analysis if local_only else analyze_resume
+    completed = queue.Queue()
+    digests = {}
+    byte_owners = {}
+    text_owners = {}
+    duplicates = defaultdict(list)
+    finished = {}
+    outstanding = 0
+
+    def notify(stage, name):
+        return lambda future: completed.put((stage, name, future))
+
+    def with_duplicates(record):
+        finished[record['file']] = record
+        yield record
+        for name in duplicates.pop(record['file'], []):
+            yield duplicate_record(name, record)
+
+    def duplicate_record(name, original):
+        return dict(original, file=name, sha256=digests[name], duplicate_of=original['file'])
+
+    extract_pool = extract_pool or get_extract_pool()
+    with ThreadPoolExecutor(max_workers=analyze_workers, thread_name_prefix='batch-analyze') as analyze_pool:
+        for name, path in documents:
+            digest = file_sha256(path)
+            digests[name] = digest
+            if digest in byte_owners:
+                duplicates[byte_owners[digest]].append(name)
+                continue
+            byte_owners[digest] = name
+            extract_pool.submit(extract_document, name, path).add_done_callback(notify('extracted', name))
+            outstanding += 1
+
+        while outstanding:
+            stage, name, future = completed.get()
+            record = {'file': name, 'sha256': digests[name]}
+
+            try:
+                result = future.result()
+            except Exception as e:
+                logger.error(f"Batch {stage} step failed for {name}: {str(e)}")
+                outstanding -= 1
+                yield from with_duplicates(dict(record, status='error', error=str(e)))
+                continue
+
+            if stage == 'extracted':
+                text_key = hashlib.sha256(normalize_text(result).encode('utf-8')).hexdigest()
+                owner = text_owners.get(text_key)
+                if owner is None:
+                    text_owners[text_key] = name
+                    analyze_pool.submit(analyze, result).add_done_callback(notify('analyzed', name))
+                    continue
+                outstanding -= 1
+                # Byte duplicates waiting on this document follow it to the text owner
+                names = [name] + duplicates.pop(name, [])
+                if owner in finished:
+                    for duplicate in names:
+                        yield duplicate_record(duplicate, finished[owner])
+                else:
+                    duplicates[owner].extend(names)
+                continue
+
+            outstanding -= 1
+            yield from with_duplicates(dict(record, status='ok', analysis=result))
+
+
+def record_batch_results(records):
+    """Save each successful record to the result store, adding its ``result_id``."""
+    for record in records:
+        if record['status'] == 'ok':
+            result_id = record_result(record['sha256'], record['file'], record['analysis'])
+            if result_id:
+                record = dict(record, result_id=result_id)
+        yield record
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Analyze a directory of resumes and write JSONL results.")
+    parser.add_argument('directory', help="Directory containing PDF, DOCX, TXT or zip files")
+    parser.add_argument('-o', '--output', help="JSONL output file (defaults to stdout)")
+    parser.add_argument('--local', action='store_true', help="Use only the local analyzer (no LLM calls)")
+    parser.add_argument('--extract-workers', type=int, default=BATCH_EXTRACT_WORKERS)
+    parser.add_argument('--analyze-workers', type=int, default=BATCH_ANALYZE_WORKERS)
+    parser.add_argument('--max-files', type=int, default=BATCH_MAX_FILES)
+    args = parser.parse_args(argv)
+
+    output = open(args.output, 'w', encoding='utf-8') if args.output else sys.stdout
+    try:
+        with DocumentSpool() as spool, ProcessPoolExecutor(max_workers=args.extract_workers) as extract_pool:
+            documents = limit_documents(iter_directory_documents(args.directory, spool), args.max_files)
+            records = run_batch(documents, local_only=args.local, extract_pool=extract_pool,
+                                analyze_workers=args.analyze_workers)
+            for record in record_batch_results(records):
+                output.write(json.dumps(record) + '\n')
+                output.flush()
+    except BatchLimitError as e:
+        parser.error(str(e))
+    finally:
+        if output is not sys.stdout:
+            output.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,136 @@
+import io
+import os
+import random
+import argparse
+
+# Size name -> number of entries per section
+CORPUS_SIZES = {
+    'small': 2,
+    'medium': 8,
+    'large': 40
+}
+
+FIRST_NAMES = ['Alex', 'Jordan', 'Sam', 'Taylor', 'Morgan', 'Casey', 'Riley', 'Jamie']
+LAST_NAMES = ['Nguyen', 'Garcia', 'Smith', 'Okafor', 'Kowalski', 'Haddad', 'Tanaka', 'Silva']
+ROLES = ['Senior Software Engineer', 'Data Analyst', 'Backend Developer', 'Engineering Manager', 'DevOps Engineer']
+COMPANIES = ['Acme Corp', 'Globex', 'Initech', 'Umbrella Labs', 'Hooli', 'Stark Industries']
+VERBS = ['Led', 'Developed', 'Implemented', 'Reduced', 'Improved', 'Managed', 'Increased', 'Designed']
+OBJECTS = ['a payments API', 'the CI pipeline', 'query latency', 'an onboarding flow', 'cloud costs', 'a data warehouse']
+DEGREES = ['BS in Computer Science', 'MS in Mathematics', 'Bachelor of Engineering', 'PhD in Physics']
+SCHOOLS = ['State University', 'Tech Institute', 'City College', 'National University']
+SKILLS = ['Python', 'Java', 'JavaScript', 'TypeScript', 'Go', 'Rust', 'Docker', 'Kubernetes', 'AWS',
+          'Azure', 'React', 'Django', 'Flask', 'Git', 'Jenkins', 'PostgreSQL']
+
+
+def generate_resume(size='medium', seed=0):
+    """Return a list of lines for a synthetic resume of the given size."""
+    rng = random.Random(seed)
+    entries = CORPUS_SIZES[size]
+    lines = [f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}", f"{rng.choice(ROLES)}", '']
+
+    lines.append('Experience')
+    for _ in range(entries):
+        lines.append(f"{rng.choice(ROLES)} at {rng.choice(COMPANIES)} ({rng.randint(1, 9)} years)")
+        for _ in range(3):
+            lines.append(f"- {rng.choice(VERBS)} {rng.choice(OBJECTS)} by {rng.randint(5, 80)}% for {rng.randint(2, 500)} users")
+    lines.append('')
+
+    lines.append('Education')
+    for _ in range(max(1, entries // 4)):
+        lines.append(f"{rng.choice(DEGREES)}, {rng.choice(SCHOOLS)}, GPA {rng.uniform(3.0, 4.0):.1f}")
+    lines.append('')
+
+    lines.append('Skills')
+    for _ in range(max(1, entries // 2)):
+        lines.append(', '.join(rng.sample(SKILLS, 6)))
+    lines.append('')
+
+    lines.append('Projects')
+    for _ in range(entries):
+        lines.append(f"- {rng.choice(VERBS)} {rng.choice(OBJECTS)}; demo and repository on GitHub, improving performance")
+    return lines
+
+
+def render_txt(lines):
+    return '\n'.join(lines).encode('utf-8')
+
+
+def render_docx(lines):
+    from docx import Document
+
+    document = Document()
+    for line in lines:
+        document.add_paragraph(line)
+    buffer = io.BytesIO()
+    document.save(buffer)
+    return buffer.getvalue()
+
+
+def render_pdf(lines, lines_per_page=45):
+    """Render lines into a minimal text PDF using the built-in Helvetica font."""
+    pages = [lines[i:i + lines_per_page] for i in range(0, len(lines), lines_per_page)] or [[]]
+    objects = [
+        b'<< /Type /Catalog /Pages 2 0 R >>',
+        ('<< /Type /Pages /Kids [%s] /Count %d >>' % (
+            ' '.join(f'{4 + 2 * i} 0 R' for i in range(len(pages))), len(pages))).encode(),
+        b'<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>'
+    ]
+    for i, page_lines in enumerate(pages):
+        operations = ['BT /F1 10 Tf 50 760 Td 15 TL']
+        for line in page_lines:
+            escaped = line.replace('\\', '\\\\').replace('(', '\\(').replace(')', '\\)')
+            operations.append(f'({escaped}) Tj T*')
+        operations.append('ET')
+        stream = '\n'.join(operations).encode('latin-1', errors='replace')
+        objects.append((
+            '<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] '
+            f'/Resources << /Font << /F1 3 0 R >> >> /Contents {5 + 2 * i} 0 R >>'
+        ).encode())
+        objects.append(b'<< /Length %d >>\nstream\n' % len(stream) + stream + b'\nendstream')
+
+    output = bytearray(b'%PDF-1.4\n')
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(output))
+        output += b'%d 0 obj\n' % number + body + b'\nendobj\n'
+    xref_offset = len(output)
+    output += b'xref\n0 %d\n0000000000 65535 f \n' % (len(objects) + 1)
+    for offset in offsets:
+        output += b'%010d 00000 n \n' % offset
+    output += b'trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n' % (len(objects) + 1, xref_offset)
+    return bytes(output)
+
+
+RENDERERS = {
+    'txt': render_txt,
+    'docx': render_docx,
+    'pdf': render_pdf
+}
+
+
+def build_corpus(count=5, sizes=tuple(CORPUS_SIZES), formats=tuple(RENDERERS), seed=0):
+    """Return a list of ``(filename, format, size, bytes)`` synthetic documents."""
+    corpus = []
+    for size in sizes:
+        for n in range(count):
+            lines = generate_resume(size, seed=seed + n)
+            for fmt in formats:
+                corpus.append((f"{size}-{n}.{fmt}", fmt, size, RENDERERS[fmt](lines)))
+    return corpus
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Write a synthetic resume corpus to a directory.")
+    parser.add_argument('directory')
+    parser.add_argument('--count', type=int, default=5, help="Documents per size and format")
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args(argv)
+
+    os.makedirs(args.directory, exist_ok=True)
+    for filename, _, _, data in build_corpus(args.count, seed=args.seed):
+        with open(os.path.join(args.directory, filename), 'wb') as f:
+            f.write(data)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,128 @@
+import json
+import time
+import random
+import argparse
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+SAMPLE_ANALYSIS = """Score (1-10): {score}
+Strengths: You quantify results clearly. Your roles show steady progression.
+Areas for Improvement: Some bullets describe duties rather than outcomes. Dates are inconsistent.
+Recommendations: Lead each bullet with an action verb. Add metrics to every role. Keep formatting consistent."""
+
+
+def sample_json():
+    """Return a random structured analysis matching the JSON response schema."""
+    return {
+        'score': random.randint(4, 9),
+        'strengths': ['You quantify results clearly.', 'Your roles show steady progression.'],
+        'improvements': ['Some bullets describe duties rather than outcomes.', 'Dates are inconsistent.'],
+        'recommendations': ['Lead each bullet with an action verb.', 'Add metrics to every role.']
+    }
+
+
+class FakeMistralHandler(BaseHTTPRequestHandler):
+    """Answers chat completion requests like the Mistral API, with injected latency and errors."""
+
+    protocol_version = 'HTTP/1.1'
+
+    def do_POST(self):
+        server = self.server
+        payload = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))) or b'{}')
+        with server.lock:
+            server.requests += 1
+
+        time.sleep(max(0.0, random.gauss(server.latency, server.jitter)))
+
+        if random.random() < server.error_rate:
+            status = random.choice([429, 500, 503])
+            body = json.dumps({'error': 'injected failure'}).encode()
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            if status == 429:
+                self.send_header('Retry-After', '0')
+            self.end_headers()
+            self.wfile.write(body)
+            return
+
+        prompt = payload.get('messages', [{}])[0].get('content', '')
+        headers = []
+        if 'SECTIONS:' in prompt:
+            # Multi-section prompt: answer each ### header in turn
+            headers = [line for line in prompt.split('SECTIONS:', 1)[1].splitlines() if line.startswith('### ')]
+        if payload.get('response_format', {}).get('type') == 'json_object':
+            if headers:
+                content = json.dumps({header[4:].strip().lower(): sample_json() for header in headers})
+            else:
+                content = json.dumps(sample_json())
+        elif headers:
+            content = '\n\n'.join(f"{header}\n{SAMPLE_ANALYSIS.format(score=random.randint(4, 9))}" for header in headers)
+        else:
+            content = SAMPLE_ANALYSIS.format(score=random.randint(4, 9))
+        usage = {'prompt_tokens': 300, 'completion_tokens': 120, 'total_tokens': 420}
+
+        if payload.get('stream'):
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/event-stream')
+            self.send_header('Transfer-Encoding', 'chunked')
+            self.end_headers()
+            words = content.split(' ')
+            for i, word in enumerate(words):
+                chunk = {'choices': [{'delta': {'content': word + (' ' if i < len(words) - 1 else '')}}]}
+                if i == len(words) - 1:
+                    chunk['usage'] = usage
+                self._write_chunk(f"data: {json.dumps(chunk)}\n\n".encode())
+            self._write_chunk(b"data: [DONE]\n\n")
+            self.wfile.write(b"0\r\n\r\n")
+            return
+
+        body = json.dumps({
+            'choices': [{'message': {'role': 'assistant', 'content': content}}],
+            'usage': usage
+        }).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _write_chunk(self, data):
+        self.wfile.write(b"%x\r\n%s\r\n" % (len(data), data))
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_server(latency=0.2, jitter=0.05, error_rate=0.0, host='127.0.0.1', port=0):
+    """Start the fake API in a background thread and return ``(server, url)``."""
+    server = ThreadingHTTPServer((host, port), FakeMistralHandler)
+    server.daemon_threads = True
+    server.latency = latency
+    server.jitter = jitter
+    server.error_rate = error_rate
+    server.requests = 0
+    server.lock = threading.Lock()
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://{host}:{server.server_address[1]}/v1/chat/completions"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run a local stand-in for the Mistral chat completions API.")
+    parser.add_argument('--port', type=int, default=8089)
+    parser.add_argument('--latency', type=float, default=0.2, help="Mean response latency in seconds")
+    parser.add_argument('--jitter', type=float, default=0.05, help="Latency standard deviation in seconds")
+    parser.add_argument('--error-rate', type=float, default=0.0, help="Fraction of requests that fail")
+    args = parser.parse_args(argv)
+
+    server, url = start_server(args.latency, args.jitter, args.error_rate, port=args.port)
+    print(f"Fake Mistral API listening on {url} (set MISTRAL_API_URL to use it)")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,203 @@
+import os
+import sys
+import json
+import time
+import logging
+import platform
+import argparse
+import statistics
+import subprocess
+import tracemalloc
+from io import BytesIO
+from concurrent.futures import ThreadPoolExecutor
+
+from werkzeug.datastructures import FileStorage
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import app  # noqa: E402
+from benchmarks.corpus import build_corpus, CORPUS_SIZES, RENDERERS  # noqa: E402
+from benchmarks.fake_mistral import start_server, SAMPLE_ANALYSIS  # noqa: E402
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def summarize(latencies, wall_time, peak_bytes=None):
+    """Summarize a list of per-operation latencies in seconds."""
+    return {
+        'count': len(latencies),
+        'mean_ms': statistics.fmean(latencies) * 1000 if latencies else 0.0,
+        'p50_ms': percentile(latencies, 50) * 1000,
+        'p95_ms': percentile(latencies, 95) * 1000,
+        'p99_ms': percentile(latencies, 99) * 1000,
+        'throughput_per_s': len(latencies) / wall_time if wall_time else 0.0,
+        'peak_memory_kb': peak_bytes / 1024 if peak_bytes is not None else None
+    }
+
+
+def measure(func, inputs, iterations=1, concurrency=1):
+    """Time ``func`` over ``inputs``, then run once more under tracemalloc for peak memory."""
+    latencies = []
+
+    def timed(item):
+        start = time.perf_counter()
+        func(item)
+        return time.perf_counter() - start
+
+    work = [item for _ in range(iterations) for item in inputs]
+    wall_start = time.perf_counter()
+    if concurrency > 1:
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            latencies = list(pool.map(timed, work))
+    else:
+        latencies = [timed(item) for item in work]
+    wall_time = time.perf_counter() - wall_start
+
+    tracemalloc.start()
+    for item in inputs:
+        func(item)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return summarize(latencies, wall_time, peak)
+
+
+def git_commit():
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], text=True,
+                                       stderr=subprocess.DEVNULL).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_benchmarks(args):
+    corpus = build_corpus(args.count, sizes=args.sizes, formats=args.formats)
+    stages = {}
+
+    def upload(document):
+        filename, _, _, data = document
+        return FileStorage(stream=BytesIO(data), filename=filename)
+
+    for fmt in args.formats:
+        for size in args.sizes:
+            documents = [doc for doc in corpus if doc[1] == fmt and doc[2] == size]
+            stages[f'extract.{fmt}.{size}'] = measure(
+                lambda doc: app.extract_text_from_file(upload(doc)), documents, args.iterations)
+
+    texts = {size: [app.extract_text_from_file(upload(doc)) for doc in corpus if doc[1] == 'txt' and doc[2] == size]
+             for size in args.sizes} if 'txt' in args.formats else {}
+    for size, size_texts in texts.items():
+        stages[f'segment.{size}'] = measure(app.split_sections, size_texts, args.iterations)
+        stages[f'local_analysis.{size}'] = measure(
+            app.perform_local_analysis, size_texts, args.iterations)
+        stages[f'local_scoring_batch.{size}'] = measure(
+            lambda batch: app.local_scorer.score_batch([app.clean_text(text) for text in batch]),
+            [size_texts * 20], args.iterations)
+
+    section_analyses = {name: SAMPLE_ANALYSIS.format(score=7) for name in ('experience', 'education', 'skills', 'projects')}
+    stages['combine_analyses'] = measure(app.combine_analyses, [section_analyses], args.iterations * 50)
+
+    if not args.skip_llm and texts:
+        server, url = start_server(args.latency, args.jitter, args.error_rate)
+        app.mistral_client.api_url = url
+        # Measure the pipeline, not the outbound rate limit
+        app.mistral_client.rate_limiter = None
+        app.ANALYSIS_CACHE_ENABLED = False
+        try:
+            all_texts = [text for size_texts in texts.values() for text in size_texts]
+            stages['analyze_resume'] = measure(app.analyze_resume, all_texts, args.iterations, args.concurrency)
+            stages['analyze_resume']['llm_requests'] = server.requests
+        finally:
+            server.shutdown()
+
+    return {
+        'meta': {
+            'commit': git_commit(),
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'config': {
+                'count': args.count,
+                'iterations': args.iterations,
+                'sizes': list(args.sizes),
+                'formats': list(args.formats),
+                'latency': args.latency,
+                'jitter': args.jitter,
+                'error_rate': args.error_rate,
+                'concurrency': args.concurrency
+            }
+        },
+        'stages': stages
+    }
+
+
+def compare(baseline, current, threshold):
+    """Print per-stage p50/p95 changes and return the names of regressed stages."""
+    regressions = []
+    print(f"{'stage':<28} {'p50 ms':>10} {'change':>8} {'p95 ms':>10} {'change':>8}")
+    for stage, result in current['stages'].items():
+        previous = baseline['stages'].get(stage)
+        if not previous:
+            print(f"{stage:<28} {result['p50_ms']:>10.2f} {'new':>8} {result['p95_ms']:>10.2f} {'new':>8}")
+            continue
+        changes = []
+        for key in ('p50_ms', 'p95_ms'):
+            before = previous[key]
+            changes.append((result[key] - before) / before if before else 0.0)
+        flag = '  REGRESSION' if max(changes) > threshold else ''
+        if flag:
+            regressions.append(stage)
+        print(f"{stage:<28} {result['p50_ms']:>10.2f} {changes[0]:>+8.1%} {result['p95_ms']:>10.2f} {changes[1]:>+8.1%}{flag}")
+    return regressions
+
+
+def print_report(results):
+    print(f"{'stage':<28} {'n':>5} {'p50 ms':>10} {'p95 ms':>10} {'p99 ms':>10} {'ops/s':>10} {'peak KB':>10}")
+    for stage, result in results['stages'].items():
+        print(f"{stage:<28} {result['count']:>5} {result['p50_ms']:>10.2f} {result['p95_ms']:>10.2f} "
+              f"{result['p99_ms']:>10.2f} {result['throughput_per_s']:>10.1f} {result['peak_memory_kb']:>10.1f}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the resume analysis pipeline.")
+    parser.add_argument('--count', type=int, default=5, help="Documents per size and format")
+    parser.add_argument('--iterations', type=int, default=3)
+    parser.add_argument('--sizes', nargs='+', default=list(CORPUS_SIZES), choices=list(CORPUS_SIZES))
+    parser.add_argument('--formats', nargs='+', default=list(RENDERERS), choices=list(RENDERERS))
+    parser.add_argument('--latency', type=float, default=0.2, help="Fake Mistral mean latency in seconds")
+    parser.add_argument('--jitter', type=float, default=0.05)
+    parser.add_argument('--error-rate', type=float, default=0.0)
+    parser.add_argument('--concurrency', type=int, default=4, help="Concurrent analyze_resume calls")
+    parser.add_argument('--skip-llm', action='store_true', help="Skip the end-to-end analyze_resume stage")
+    parser.add_argument('-o', '--output', help="Write results as JSON to this file")
+    parser.add_argument('--compare', help="Baseline JSON file to compare against")
+    parser.add_argument('--threshold', type=float, default=0.10, help="Relative slowdown treated as a regression")
+    parser.add_argument('--verbose', action='store_true', help="Keep application logging enabled")
+    args = parser.parse_args(argv)
+
+    if not args.verbose:
+        logging.disable(logging.CRITICAL)
+
+    results = run_benchmarks(args)
+    print_report(results)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            baseline = json.load(f)
+        print()
+        if compare(baseline, results, args.threshold):
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
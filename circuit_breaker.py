@@ -0,0 +1,129 @@
+import os
+import time
+import logging
+import threading
+from collections import deque
+
+logger = logging.getLogger(__name__)
+
+# Circuit breaker settings
+BREAKER_WINDOW_SIZE = int(os.getenv('BREAKER_WINDOW_SIZE', '20'))
+BREAKER_MIN_REQUESTS = int(os.getenv('BREAKER_MIN_REQUESTS', '5'))
+BREAKER_ERROR_RATE = float(os.getenv('BREAKER_ERROR_RATE', '0.5'))
+BREAKER_SLOW_CALL_SECONDS = float(os.getenv('BREAKER_SLOW_CALL_SECONDS', '20'))
+BREAKER_OPEN_SECONDS = float(os.getenv('BREAKER_OPEN_SECONDS', '30'))
+BREAKER_HALF_OPEN_PROBES = int(os.getenv('BREAKER_HALF_OPEN_PROBES', '1'))
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+
+class CircuitBreaker:
+    """Rolling-window circuit breaker that trips on error rate and slow calls.
+
+    Calls slower than ``slow_call_seconds`` count as failures, so a backend
+    that is up but crawling trips the breaker too. After ``open_seconds`` the
+    breaker lets ``half_open_probes`` calls through; one success closes it and
+    one failure opens it again.
+    """
+
+    def __init__(self, window_size=BREAKER_WINDOW_SIZE, min_requests=BREAKER_MIN_REQUESTS,
+                 error_rate=BREAKER_ERROR_RATE, slow_call_seconds=BREAKER_SLOW_CALL_SECONDS,
+                 open_seconds=BREAKER_OPEN_SECONDS, half_open_probes=BREAKER_HALF_OPEN_PROBES):
+        self.min_requests = min_requests
+        self.error_rate = error_rate
+        self.slow_call_seconds = slow_call_seconds
+        self.open_seconds = open_seconds
+        self.half_open_probes = half_open_probes
+
+        self._outcomes = deque(maxlen=window_size)
+        self._latencies = deque(maxlen=max(100, window_size))
+        self._state = CLOSED
+        self._opened_at = 0.0
+        self._probes = 0
+        self._trips = 0
+        self._rejected = 0
+        self._lock = threading.Lock()
+
+    @property
+    def state(self):
+        with self._lock:
+            return self._current_state()
+
+    def allow(self):
+        """Return True if a call may go ahead, reserving a probe slot when half-open."""
+        with self._lock:
+            state = self._current_state()
+            if state == CLOSED:
+                return True
+            if state == HALF_OPEN and self._probes < self.half_open_probes:
+                self._probes += 1
+                return True
+            self._rejected += 1
+            return False
+
+    def release(self):
+        """Give back the probe slot ``allow()`` reserved for a call that was never sent."""
+        with self._lock:
+            if self._current_state() == HALF_OPEN:
+                self._probes = max(0, self._probes - 1)
+
+    def record(self, success, latency=None):
+        """Record the outcome of a call that ``allow()`` let through."""
+        if success and latency is not None and latency > self.slow_call_seconds:
+            success = False
+        with self._lock:
+            if success and latency is not None:
+                self._latencies.append(latency)
+
+            state = self._current_state()
+            if state == HALF_OPEN:
+                self._probes = max(0, self._probes - 1)
+                if success:
+                    logger.info("Circuit breaker closed after successful probe")
+                    self._state = CLOSED
+                    self._outcomes.clear()
+                else:
+                    self._open()
+                return
+            if state == OPEN:
+                # A call that started before the breaker opened
+                return
+
+            self._outcomes.append(success)
+            failures = self._outcomes.count(False)
+            if len(self._outcomes) >= self.min_requests and failures / len(self._outcomes) >= self.error_rate:
+                logger.warning(f"Circuit breaker opened: {failures}/{len(self._outcomes)} recent calls failed")
+                self._open()
+
+    def latency_percentile(self, pct):
+        """Return the ``pct`` percentile of recent successful call latencies, or None."""
+        with self._lock:
+            latencies = sorted(self._latencies)
+        if len(latencies) < self.min_requests:
+            return None
+        return latencies[min(len(latencies) - 1, int(len(latencies) * pct / 100))]
+
+    def stats(self):
+        with self._lock:
+            return {
+                'state': self._current_state(),
+                'window': len(self._outcomes),
+                'failures': self._outcomes.count(False),
+                'trips': self._trips,
+                'rejected': self._rejected
+            }
+
+    def _current_state(self):
+        if self._state == OPEN and time.monotonic() - self._opened_at >= self.open_seconds:
+            self._state = HALF_OPEN
+            self._probes = 0
+        return self._state
+
+    def _open(self):
+        self._state = OPEN
+        self._opened_at = time.monotonic()
+        self._probes = 0
+        self._trips += 1
+        self._outcomes.clear()
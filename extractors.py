@@ -0,0 +1,550 @@
+import io
+import os
+import re
+import mmap
+import shutil
+import logging
+import tempfile
+import threading
+import zipfile
+from contextlib import contextmanager
+from concurrent.futures import ProcessPoolExecutor
+
+logger = logging.getLogger(__name__)
+
+# PDF extraction limits
+PDF_MAX_PAGES = int(os.getenv('PDF_MAX_PAGES', '50'))
+PDF_MAX_BYTES = int(os.getenv('PDF_MAX_BYTES', str(10 * 1024 * 1024)))
+# Documents with more pages than this are split across the process pool
+PDF_PARALLEL_MIN_PAGES = int(os.getenv('PDF_PARALLEL_MIN_PAGES', '16'))
+PDF_EXTRACT_WORKERS = int(os.getenv('PDF_EXTRACT_WORKERS', str(os.cpu_count() or 2)))
+# DOCX extraction stops after this many characters of text
+DOCX_MAX_CHARS = int(os.getenv('DOCX_MAX_CHARS', '200000'))
+
+SNIFF_BYTES = 2048
+SPOOL_MAX_MEMORY = 1024 * 1024
+COPY_CHUNK_SIZE = 64 * 1024
+# Bytes handed to chardet when an upload is not UTF-8
+CHARDET_SAMPLE_BYTES = 64 * 1024
+# Uploads whose leading bytes are more than this share of control bytes are not text
+TEXT_MAX_CONTROL_RATIO = 0.1
+TEXT_BOMS = (b'\xef\xbb\xbf', b'\xff\xfe', b'\xfe\xff')
+
+_pdf_pool = None
+_pdf_pool_lock = threading.Lock()
+
+# Registered backends in sniffing order: (name, sniff, extract). The format of
+# an upload is decided from its leading bytes rather than its filename, and each
+# backend imports its parser library on first use so workers only pay for the
+# ones they need.
+_extractors = []
+
+
+class ExtractionLimitError(ValueError):
+    """Raised when an upload exceeds the configured extraction limits."""
+
+
+class UnsupportedFormatError(ValueError):
+    """Raised when no registered extractor recognizes an upload."""
+
+# Parser libraries imported lazily by the backends below
+PARSER_MODULES = ('PyPDF2', 'chardet')
+
+
+def preload_backends():
+    """Import every parser library now, e.g. in a preforking server's master process."""
+    import importlib
+
+    for module in PARSER_MODULES:
+        try:
+            importlib.import_module(module)
+        except ImportError as e:
+            logger.warning(f"Could not preload {module}: {str(e)}")
+
+
+def register_extractor(name, sniff=None):
+    """Register an extraction backend.
+
+    ``sniff(head, stream)`` receives the first bytes of the upload and the
+    seekable stream, and returns True when the backend handles it. A backend
+    without a sniffer is used as the fallback when nothing else matches.
+    """
+    def decorator(extract):
+        _extractors.append((name, sniff, extract))
+        return extract
+    return decorator
+
+
+def detect_format(file):
+    """Return the name of the extractor that recognizes ``file``'s content."""
+    stream = _stream(file)
+    stream.seek(0)
+    head = stream.read(SNIFF_BYTES)
+    stream.seek(0)
+
+    fallback = None
+    for name, sniff, _ in _extractors:
+        if sniff is None:
+            fallback = fallback or name
+        elif sniff(head, stream):
+            stream.seek(0)
+            return name
+        stream.seek(0)
+
+    if fallback is None:
+        raise UnsupportedFormatError("Unrecognized file format")
+    return fallback
+
+
+def extract_text(file):
+    """Extract text from ``file`` with the backend chosen by content sniffing."""
+    name = detect_format(file)
+    logger.info(f"Using {name} extraction")
+    for extractor_name, _, extract in _extractors:
+        if extractor_name == name:
+            return extract(file)
+
+
+def _stream(file):
+    return getattr(file, 'stream', file)
+
+
+def _zip_members(stream):
+    try:
+        with zipfile.ZipFile(stream) as archive:
+            return set(archive.namelist())
+    except zipfile.BadZipFile:
+        return set()
+
+
+def _is_odt(head, stream):
+    if not head.startswith(b'PK\x03\x04'):
+        return False
+    # ODF requires an uncompressed "mimetype" entry at the start of the archive
+    return b'mimetypeapplication/vnd.oasis.opendocument.text' in head[:200]
+
+
+def _is_docx(head, stream):
+    return head.startswith(b'PK\x03\x04') and 'word/document.xml' in _zip_members(stream)
+
+
+def _is_text(head, stream):
+    if head.startswith(TEXT_BOMS):
+        return True
+    # NUL bytes and other control characters mean an image, archive or legacy binary format
+    if b'\x00' in head:
+        return False
+    control = sum(1 for byte in head if byte < 32 and byte not in b'\t\n\r\f\x1b')
+    return control <= len(head) * TEXT_MAX_CONTROL_RATIO
+
+
+def _is_html(head, stream):
+    start = head.lstrip().lower()
+    return start.startswith(b'<!doctype html') or start.startswith(b'<html') or b'<html' in start[:512]
+
+
+def _get_pdf_pool():
+    global _pdf_pool
+    with _pdf_pool_lock:
+        if _pdf_pool is None:
+            _pdf_pool = ProcessPoolExecutor(max_workers=PDF_EXTRACT_WORKERS)
+        return _pdf_pool
+
+
+def _seekable_source(file, max_bytes):
+    """Return a seekable binary stream for ``file`` without copying it when possible.
+
+    Flask uploads are already backed by a spooled temporary file, so those are
+    used in place. Anything else is copied into a spooled temporary file, with
+    the size limit enforced while reading.
+    """
+    stream = _stream(file)
+    if stream.seekable():
+        stream.seek(0, os.SEEK_END)
+        size = stream.tell()
+        if size > max_bytes:
+            raise ExtractionLimitError(f"PDF is {size} bytes; the limit is {max_bytes}")
+        stream.seek(0)
+        return stream
+
+    spool = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_MEMORY)
+    size = 0
+    while True:
+        chunk = stream.read(COPY_CHUNK_SIZE)
+        if not chunk:
+            break
+        size += len(chunk)
+        if size > max_bytes:
+            spool.close()
+            raise ExtractionLimitError(f"PDF exceeds the {max_bytes} byte limit")
+        spool.write(chunk)
+    spool.seek(0)
+    return spool
+
+
+def _extract_pdf_pages(path, start, stop):
+    """Extract text for pages ``start:stop`` of the PDF at ``path``. Runs in a worker process."""
+    import PyPDF2
+
+    with open(path, 'rb') as f:
+        reader = PyPDF2.PdfReader(f)
+        return [reader.pages[i].extract_text() for i in range(start, stop)]
+
+
+def _extract_pages_parallel(source, page_count):
+    # Worker processes need a path they can open, so the stream is written to disk once
+    with tempfile.NamedTemporaryFile(suffix='.pdf') as f:
+        source.seek(0)
+        shutil.copyfileobj(source, f, COPY_CHUNK_SIZE)
+        f.flush()
+
+        pool = _get_pdf_pool()
+        chunk_size = -(-page_count // PDF_EXTRACT_WORKERS)
+        futures = [
+            pool.submit(_extract_pdf_pages, f.name, start, min(start + chunk_size, page_count))
+            for start in range(0, page_count, chunk_size)
+        ]
+        return [page_text for future in futures for page_text in future.result()]
+
+
+def extract_pdf_text(file, max_pages=PDF_MAX_PAGES, max_bytes=PDF_MAX_BYTES):
+    """Extract text from a PDF upload, stopping after ``max_pages`` pages."""
+    import PyPDF2
+
+    source = _seekable_source(file, max_bytes)
+    reader = PyPDF2.PdfReader(source)
+
+    page_count = len(reader.pages)
+    if page_count > max_pages:
+        logger.warning(f"PDF has {page_count} pages; only the first {max_pages} will be extracted")
+        page_count = max_pages
+
+    if page_count >= PDF_PARALLEL_MIN_PAGES and PDF_EXTRACT_WORKERS > 1:
+        page_texts = _extract_pages_parallel(source, page_count)
+    else:
+        page_texts = [reader.pages[i].extract_text() for i in range(page_count)]
+
+    return ''.join(page_text + "\n\n" for page_text in page_texts if page_text)
+
+
+@register_extractor('pdf', sniff=lambda head, stream: b'%PDF-' in head[:1024])
+def extract_pdf(file):
+    """Extract text from PDF files."""
+    try:
+        text = extract_pdf_text(file)
+
+        # Check if we got meaningful text
+        if len(text.strip()) < 100:
+            logger.warning("Minimal text extracted from PDF - might be scanned")
+            # Here you would add OCR handling, but we'll skip for now
+
+        if not text.strip():
+            raise ValueError("No text could be extracted from the PDF")
+
+        return text
+    except Exception as e:
+        logger.error(f"Error reading PDF: {str(e)}")
+        raise
+
+
+@register_extractor('odt', sniff=_is_odt)
+def extract_odt(file):
+    """Extract paragraphs and headings from OpenDocument text files."""
+    from xml.etree import ElementTree
+
+    text_ns = '{urn:oasis:names:tc:opendocument:xmlns:text:1.0}'
+    try:
+        stream = _stream(file)
+        stream.seek(0)
+        with zipfile.ZipFile(stream) as archive:
+            root = ElementTree.fromstring(archive.read('content.xml'))
+
+        parts = []
+        for element in root.iter():
+            if element.tag in (text_ns + 'p', text_ns + 'h'):
+                paragraph = ''.join(element.itertext())
+                if paragraph.strip():
+                    parts.append(paragraph + "\n\n")
+
+        text = ''.join(parts)
+        if not text.strip():
+            raise ValueError("No text could be extracted from the ODT file")
+        return text
+    except Exception as e:
+        logger.error(f"Error reading ODT: {str(e)}")
+        raise
+
+
+WORD_NS = '{http://schemas.openxmlformats.org/wordprocessingml/2006/main}'
+
+
+def iter_docx_blocks(stream):
+    """Yield ``('paragraph', text)`` and ``('cell', text)`` blocks of a DOCX in document order.
+
+    ``word/document.xml`` is read with an incremental parser and each
+    top-level block is discarded once emitted, so memory stays flat however
+    large the document is. Table cells are yielded once each: a cell spanning
+    several grid columns appears once in the XML, and the continuation cells
+    of a vertical merge are skipped. A ``('row', '')`` block ends every
+    top-level table row. Paragraphs inside a cell, including those of nested
+    tables, become lines of that cell's text.
+    """
+    from xml.etree import ElementTree
+
+    w = WORD_NS
+    with zipfile.ZipFile(stream) as archive, archive.open('word/document.xml') as xml:
+        depth = 0
+        body = None
+        runs = []
+        # Paragraph lines of each open table cell, innermost last
+        cells = []
+        for event, element in ElementTree.iterparse(xml, events=('start', 'end')):
+            if event == 'start':
+                depth += 1
+                if element.tag == w + 'body':
+                    body = element
+                elif element.tag == w + 'tc':
+                    cells.append([])
+                continue
+
+            depth -= 1
+            tag = element.tag
+            if tag == w + 't':
+                runs.append(element.text or '')
+            elif tag == w + 'tab':
+                runs.append('\t')
+            elif tag in (w + 'br', w + 'cr'):
+                runs.append('\n')
+            elif tag == w + 'p':
+                paragraph = ''.join(runs)
+                runs = []
+                if cells:
+                    cells[-1].append(paragraph)
+                elif paragraph.strip():
+                    yield 'paragraph', paragraph
+            elif tag == w + 'tc':
+                text = '\n'.join(line for line in cells.pop() if line.strip())
+                merge = element.find(f'{w}tcPr/{w}vMerge')
+                if merge is not None and merge.get(w + 'val', 'continue') == 'continue':
+                    text = ''
+                if text and cells:
+                    cells[-1].append(text)
+                elif text:
+                    yield 'cell', text
+            elif tag == w + 'tr' and not cells:
+                yield 'row', ''
+
+            if tag in (w + 'p', w + 'tc', w + 'tr', w + 'tbl'):
+                element.clear()
+            # Drop finished top-level blocks so the tree never grows
+            if depth == 2 and body is not None:
+                body.clear()
+
+
+def docx_to_text(stream, max_chars=DOCX_MAX_CHARS):
+    """Return the text of a DOCX, stopping once ``max_chars`` characters are collected."""
+    parts = []
+    size = 0
+    for kind, text in iter_docx_blocks(stream):
+        part = text + "\n\n" if kind == 'paragraph' else text + "\n" if kind == 'cell' else "\n"
+        parts.append(part)
+        size += len(part)
+        if max_chars and size >= max_chars:
+            logger.warning(f"DOCX text exceeds {max_chars} characters; the rest is not extracted")
+            break
+    text = ''.join(parts)
+    return text[:max_chars] if max_chars else text
+
+
+@register_extractor('docx', sniff=_is_docx)
+def extract_docx(file):
+    """Extract text from DOCX files."""
+    try:
+        stream = _stream(file)
+        stream.seek(0)
+        text = docx_to_text(stream)
+
+        if not text.strip():
+            raise ValueError("No text could be extracted from the DOCX file")
+
+        return text
+    except Exception as e:
+        logger.error(f"Error reading DOCX: {str(e)}")
+        raise
+
+
+# RTF destinations whose contents are metadata rather than document text
+RTF_SKIP_DESTINATIONS = {
+    'fonttbl', 'colortbl', 'stylesheet', 'info', 'pict', 'header', 'footer',
+    'headerl', 'headerr', 'footerl', 'footerr', 'listtable', 'listoverridetable',
+    'themedata', 'colorschememapping', 'latentstyles', 'datastore', 'xmlnstbl', 'rsidtbl'
+}
+RTF_TOKEN = re.compile(r"\\([a-z]+)(-?\d+)? ?|\\'([0-9a-f]{2})|\\([^a-z])|([{}])|[\r\n]+|([^\\{}\r\n]+)", re.IGNORECASE)
+
+
+def rtf_to_text(rtf):
+    """Convert RTF markup to plain text, skipping metadata destinations."""
+    parts = []
+    stack = []
+    skipping = False
+    uc_skip = 1
+    pending_skip = 0
+
+    for match in RTF_TOKEN.finditer(rtf):
+        word, arg, hex_code, symbol, brace, literal = match.groups()
+        if brace == '{':
+            stack.append(skipping)
+        elif brace == '}':
+            skipping = stack.pop() if stack else False
+        elif symbol is not None:
+            if symbol == '*':
+                skipping = True
+            elif not skipping and symbol in '\\{}':
+                parts.append(symbol)
+        elif word is not None:
+            word = word.lower()
+            if word in RTF_SKIP_DESTINATIONS:
+                skipping = True
+            elif skipping:
+                continue
+            elif word in ('par', 'line', 'sect', 'page'):
+                parts.append('\n')
+            elif word == 'tab':
+                parts.append('\t')
+            elif word == 'uc' and arg:
+                uc_skip = int(arg)
+            elif word == 'u' and arg:
+                parts.append(chr(int(arg) % 65536))
+                pending_skip = uc_skip
+        elif hex_code is not None:
+            if pending_skip:
+                pending_skip -= 1
+            elif not skipping:
+                parts.append(bytes([int(hex_code, 16)]).decode('cp1252', errors='replace'))
+        elif literal is not None and not skipping:
+            if pending_skip:
+                skipped = min(pending_skip, len(literal))
+                literal = literal[skipped:]
+                pending_skip -= skipped
+            parts.append(literal)
+
+    return ''.join(parts)
+
+
+@register_extractor('rtf', sniff=lambda head, stream: head.lstrip().startswith(b'{\\rtf'))
+def extract_rtf(file):
+    """Extract text from RTF files."""
+    try:
+        with _mapped(file) as content:
+            text = rtf_to_text(str(content, 'latin-1'))
+        if not text.strip():
+            raise ValueError("No text could be extracted from the RTF file")
+        return text
+    except Exception as e:
+        logger.error(f"Error reading RTF: {str(e)}")
+        raise
+
+
+def html_to_text(html):
+    """Convert HTML to plain text, dropping scripts and styles."""
+    from html.parser import HTMLParser
+
+    block_tags = {'p', 'div', 'br', 'li', 'tr', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'section', 'header', 'footer'}
+
+    class TextCollector(HTMLParser):
+        def __init__(self):
+            super().__init__(convert_charrefs=True)
+            self.parts = []
+            self.skip_depth = 0
+
+        def handle_starttag(self, tag, attrs):
+            if tag in ('script', 'style'):
+                self.skip_depth += 1
+            elif tag in block_tags:
+                self.parts.append('\n')
+
+        def handle_endtag(self, tag):
+            if tag in ('script', 'style') and self.skip_depth:
+                self.skip_depth -= 1
+            elif tag in block_tags:
+                self.parts.append('\n')
+
+        def handle_data(self, data):
+            if not self.skip_depth:
+                self.parts.append(data)
+
+    collector = TextCollector()
+    collector.feed(html)
+    collector.close()
+    return ''.join(collector.parts)
+
+
+@register_extractor('html', sniff=_is_html)
+def extract_html(file):
+    """Extract visible text from HTML files."""
+    try:
+        with _mapped(file) as content:
+            text = html_to_text(decode_text(content))
+        if not text.strip():
+            raise ValueError("No text could be extracted from the HTML file")
+        return text
+    except Exception as e:
+        logger.error(f"Error reading HTML: {str(e)}")
+        raise
+
+
+def decode_text(content):
+    """Decode a bytes-like object as UTF-8, falling back to chardet's guess."""
+    # Try UTF-8 first
+    try:
+        return str(content, 'utf-8')
+    except UnicodeDecodeError:
+        import chardet
+
+        # If UTF-8 fails, detect the encoding from a leading sample
+        detected = chardet.detect(bytes(content[:CHARDET_SAMPLE_BYTES]))
+        encoding = detected['encoding'] if detected and detected['encoding'] else 'latin-1'
+        logger.debug(f"Detected encoding: {encoding}")
+        return str(content, encoding, 'replace')
+
+
+@contextmanager
+def _mapped(file):
+    """Yield the upload's bytes without copying them.
+
+    In-memory spools are exposed as a memoryview and on-disk ones as a
+    read-only memory map; other streams fall back to ``read()``.
+    """
+    stream = _stream(file)
+    # SpooledTemporaryFile wraps either a BytesIO or a real file
+    inner = getattr(stream, '_file', stream)
+    if isinstance(inner, io.BytesIO):
+        view = inner.getbuffer()
+        try:
+            yield view
+        finally:
+            view.release()
+        return
+
+    try:
+        fileno = inner.fileno()
+        size = os.fstat(fileno).st_size
+    except (AttributeError, OSError, io.UnsupportedOperation):
+        size = 0
+    if not size:
+        stream.seek(0)
+        yield stream.read()
+        return
+
+    mapped = mmap.mmap(fileno, 0, access=mmap.ACCESS_READ)
+    try:
+        yield mapped
+    finally:
+        mapped.close()
+
+
+@register_extractor('txt', sniff=_is_text)
+def extract_txt(file):
+    """Extract text from plain text files with encoding detection."""
+    with _mapped(file) as content:
+        return decode_text(content)
@@ -0,0 +1,69 @@
+import os
+import time
+import signal
+import logging
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+bind = os.getenv('BIND', '0.0.0.0:8000')
+
+# Threaded workers: a slow upload or a long LLM call ties up one thread, not
+# a whole worker process. Background jobs, lineage (without LINEAGE_PATH) and
+# metrics live in each process, so run one worker and scale with threads; with
+# more workers a job can only be polled from the process that accepted it.
+worker_class = 'gthread'
+workers = int(os.getenv('WEB_CONCURRENCY', '1'))
+threads = int(os.getenv('GUNICORN_THREADS', '16'))
+
+# Import the app and parser libraries once in the master and fork from there
+preload_app = os.getenv('GUNICORN_PRELOAD', 'true').lower() == 'true'
+
+# Analyses can run up to ANALYSIS_DEADLINE_SECONDS, so allow for that plus upload time
+timeout = int(os.getenv('GUNICORN_TIMEOUT', '120'))
+# On SIGTERM, workers stop accepting and get this long to finish in-flight requests and jobs
+graceful_timeout = int(os.getenv('GUNICORN_GRACEFUL_TIMEOUT', '90'))
+keepalive = int(os.getenv('GUNICORN_KEEPALIVE', '5'))
+
+# Recycling a worker drops its queued and finished jobs, so it is off by
+# default while job state lives in the process
+max_requests = int(os.getenv('GUNICORN_MAX_REQUESTS', '0'))
+max_requests_jitter = int(os.getenv('GUNICORN_MAX_REQUESTS_JITTER', '100'))
+
+# Request line and header limits; the body limit is MAX_CONTENT_LENGTH in the app
+limit_request_line = 4094
+limit_request_fields = 100
+
+accesslog = os.getenv('GUNICORN_ACCESS_LOG', '-')
+loglevel = os.getenv('LOG_LEVEL', 'info').lower()
+
+
+def post_worker_init(worker):
+    """Note when the worker is told to stop, so worker_exit knows how much grace is left."""
+    handle_exit = worker.handle_exit
+
+    def handle_term(sig, frame):
+        if getattr(worker, 'stop_requested_at', None) is None:
+            worker.stop_requested_at = time.monotonic()
+        handle_exit(sig, frame)
+
+    signal.signal(signal.SIGTERM, handle_term)
+
+
+def worker_exit(server, worker):
+    """Let queued and running background analyses finish before the worker exits.
+
+    The arbiter kills the worker ``graceful_timeout`` seconds after asking it to
+    stop, so draining only gets whatever that window has left.
+    """
+    from app import drain
+
+    stop_requested_at = getattr(worker, 'stop_requested_at', None)
+    timeout = graceful_timeout
+    if stop_requested_at is not None:
+        timeout = max(0.0, graceful_timeout - (time.monotonic() - stop_requested_at))
+    if not drain(timeout=timeout):
+        logger.warning(f"Worker {worker.pid} exited with background jobs still unfinished")
@@ -0,0 +1,139 @@
+import os
+import time
+import uuid
+import queue
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+# Background job settings
+JOB_WORKERS = int(os.getenv('JOB_WORKERS', '4'))
+JOB_QUEUE_SIZE = int(os.getenv('JOB_QUEUE_SIZE', '32'))
+JOB_RESULT_TTL_SECONDS = float(os.getenv('JOB_RESULT_TTL_SECONDS', '3600'))
+
+
+class JobQueueFull(Exception):
+    """Raised when the job queue has reached its configured depth."""
+
+
+class JobManager:
+    """Bounded in-process job queue served by a fixed pool of worker threads."""
+
+    def __init__(self, handler, workers=JOB_WORKERS, max_depth=JOB_QUEUE_SIZE,
+                 result_ttl=JOB_RESULT_TTL_SECONDS):
+        self.handler = handler
+        self.workers = workers
+        self.result_ttl = result_ttl
+        self._queue = queue.Queue(maxsize=max_depth)
+        self._jobs = {}
+        self._lock = threading.Lock()
+        self._threads = []
+        self._closed = False
+
+    def submit(self, *args, on_discard=None):
+        """Queue ``handler(*args)`` and return the new job id.
+
+        ``on_discard`` is called with ``args`` if the job is rejected, so
+        callers can release resources such as temporary files.
+        """
+        if self._closed:
+            if on_discard:
+                on_discard(*args)
+            raise JobQueueFull("Job queue is shutting down")
+        self._ensure_workers()
+        self._prune()
+
+        job_id = uuid.uuid4().hex
+        job = {
+            'id': job_id,
+            'status': 'queued',
+            'created_at': time.time(),
+            'started_at': None,
+            'finished_at': None,
+            'result': None,
+            'error': None
+        }
+        with self._lock:
+            self._jobs[job_id] = job
+        try:
+            self._queue.put_nowait((job_id, args))
+        except queue.Full:
+            with self._lock:
+                del self._jobs[job_id]
+            if on_discard:
+                on_discard(*args)
+            raise JobQueueFull("Job queue is full")
+        return job_id
+
+    def get(self, job_id):
+        """Return a copy of the job record, or ``None`` if unknown or expired."""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return dict(job) if job else None
+
+    def stats(self):
+        with self._lock:
+            counts = {}
+            for job in self._jobs.values():
+                counts[job['status']] = counts.get(job['status'], 0) + 1
+        return {
+            'queue_depth': self._queue.qsize(),
+            'queue_capacity': self._queue.maxsize,
+            'workers': self.workers,
+            'jobs': counts
+        }
+
+    def shutdown(self, timeout=None):
+        """Stop accepting jobs and wait for queued and running ones to finish.
+
+        Returns False if jobs were still outstanding after ``timeout`` seconds.
+        """
+        self._closed = True
+        deadline = time.monotonic() + timeout if timeout is not None else None
+        with self._queue.all_tasks_done:
+            while self._queue.unfinished_tasks:
+                remaining = deadline - time.monotonic() if deadline is not None else None
+                if remaining is not None and remaining <= 0:
+                    logger.warning(f"{self._queue.unfinished_tasks} jobs still unfinished at shutdown")
+                    return False
+                self._queue.all_tasks_done.wait(remaining)
+        return True
+
+    def _ensure_workers(self):
+        with self._lock:
+            if self._threads:
+                return
+            for i in range(self.workers):
+                thread = threading.Thread(target=self._work, name=f'job-worker-{i}', daemon=True)
+                thread.start()
+                self._threads.append(thread)
+
+    def _work(self):
+        while True:
+            job_id, args = self._queue.get()
+            self._update(job_id, status='running', started_at=time.time())
+            try:
+                result = self.handler(*args)
+                self._update(job_id, status='done', result=result, finished_at=time.time())
+            except Exception as e:
+                logger.error(f"Job {job_id} failed: {str(e)}")
+                self._update(job_id, status='failed', error=str(e), finished_at=time.time())
+            finally:
+                self._queue.task_done()
+
+    def _update(self, job_id, **fields):
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job:
+                job.update(fields)
+
+    def _prune(self):
+        cutoff = time.time() - self.result_ttl
+        with self._lock:
+            expired = [
+                job_id for job_id, job in self._jobs.items()
+                if job['finished_at'] is not None and job['finished_at'] < cutoff
+            ]
+            for job_id in expired:
+                del self._jobs[job_id]
@@ -0,0 +1,70 @@
+import re
+from collections import Counter, defaultdict
+
+# Keyword vocabulary for the local analyzer: section -> metric -> keywords.
+# The "section" metric counts header mentions; the others feed the content score.
+LOCAL_KEYWORDS = {
+    'experience': {
+        'section': ['experience', 'work history', 'employment'],
+        'metrics': ['achieved', 'increased', 'reduced', 'improved', 'led', 'managed', 'developed', 'implemented'],
+        'duration': ['year', 'years', 'month', 'months', 'present', 'current'],
+        'role': ['senior', 'junior', 'lead', 'manager', 'director', 'engineer', 'developer', 'analyst']
+    },
+    'education': {
+        'section': ['education', 'academic', 'degree', 'university', 'college'],
+        'metrics': ['gpa', 'grade', 'honor', 'honors', "dean's list", 'deans list', 'scholarship'],
+        'degree': ['bachelor', 'master', 'phd', 'doctorate', 'bs', 'ms', 'ph.d'],
+        'field': ['computer science', 'engineering', 'mathematics', 'physics', 'business']
+    },
+    'skills': {
+        'section': ['skills', 'technical', 'proficient', 'expertise'],
+        'programming': ['python', 'java', 'c++', 'javascript', 'typescript', 'ruby', 'go', 'rust'],
+        'tools': ['git', 'docker', 'kubernetes', 'aws', 'azure', 'gcp', 'jenkins'],
+        'frameworks': ['react', 'angular', 'vue', 'django', 'flask', 'spring', 'node.js']
+    },
+    'projects': {
+        'section': ['projects', 'portfolio', 'work samples'],
+        'metrics': ['github', 'repository', 'demo', 'implementation', 'contribution'],
+        'impact': ['user', 'users', 'performance', 'efficiency', 'scalability', 'reliability']
+    }
+}
+
+
+class KeywordMatcher:
+    """Count every keyword of a vocabulary table in a single regex pass.
+
+    All keywords are compiled into one alternation with word boundaries and
+    matched against the lowercased text, so short terms like "go" or "ms"
+    only match whole words.
+    """
+
+    def __init__(self, table=LOCAL_KEYWORDS):
+        self.table = table
+        self._targets = defaultdict(list)
+        for section, metrics in table.items():
+            for metric, keywords in metrics.items():
+                for keyword in keywords:
+                    self._targets[keyword.lower()].append((section, metric))
+
+        # Longest first so multi-word phrases win; lookarounds instead of \b so
+        # keywords ending in symbols (c++, node.js) still need a word boundary
+        keywords = sorted(self._targets, key=len, reverse=True)
+        alternation = r'(?<!\w)(' + '|'.join(r'\s+'.join(map(re.escape, keyword.split())) for keyword in keywords) + r')(?!\w)'
+        # Matching lowercased text without IGNORECASE is several times faster
+        self._pattern = re.compile(alternation)
+
+    def keywords(self):
+        """Return the normalized vocabulary keywords."""
+        return list(self._targets)
+
+    def targets(self, keyword):
+        """Return the ``(section, metric)`` pairs a normalized keyword counts towards."""
+        return list(self._targets[keyword])
+
+    def count_keywords(self, text):
+        """Return a Counter of the normalized vocabulary keywords found in ``text``."""
+        counts = Counter(self._pattern.findall(text.lower()))
+        # Multi-word keywords match across any whitespace; fold those variants together
+        for found in [found for found in counts if found not in self._targets]:
+            counts[' '.join(found.split())] += counts.pop(found)
+        return counts
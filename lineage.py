@@ -0,0 +1,88 @@
+import os
+import re
+import json
+import time
+import sqlite3
+import logging
+import threading
+
+from storage import SQLiteConnection, LRUDict
+
+logger = logging.getLogger(__name__)
+
+# Lineage settings
+LINEAGE_MAX_ENTRIES = int(os.getenv('LINEAGE_MAX_ENTRIES', '10000'))
+# Set to e.g. instance/lineage.sqlite3 to keep section results across restarts
+LINEAGE_PATH = os.getenv('LINEAGE_PATH', '')
+
+LINEAGE_ID = re.compile(r'^[\w.:@-]{1,128}$')
+
+
+def valid_lineage_id(lineage_id):
+    """Return True if ``lineage_id`` is an acceptable candidate/document identifier."""
+    return bool(lineage_id) and bool(LINEAGE_ID.match(lineage_id))
+
+
+class LineageStore:
+    """Latest section fingerprints and analyses per document lineage.
+
+    Each lineage (a candidate or document id chosen by the client) maps
+    section names to ``(fingerprint, analysis)``. A new revision only needs
+    fresh analyses for sections whose fingerprint changed.
+    """
+
+    def __init__(self, max_entries=LINEAGE_MAX_ENTRIES, path=LINEAGE_PATH):
+        self.max_entries = max_entries
+        self.path = path
+        self._entries = LRUDict(max_entries)
+        self._lock = threading.Lock()
+        self._db = SQLiteConnection(path) if path else None
+
+        if self._db is not None:
+            db = self._db.get()
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS lineage_sections ("
+                "lineage_id TEXT NOT NULL, section TEXT NOT NULL, fingerprint TEXT NOT NULL, "
+                "analysis TEXT NOT NULL, updated_at REAL NOT NULL, PRIMARY KEY (lineage_id, section))"
+            )
+            db.commit()
+
+    def get(self, lineage_id):
+        """Return ``{section: (fingerprint, analysis)}`` for ``lineage_id``."""
+        with self._lock:
+            sections = self._entries.get(lineage_id)
+            if sections is not None:
+                self._entries.move_to_end(lineage_id)
+                return dict(sections)
+
+            if self._db is None:
+                return {}
+            rows = self._db.get().execute(
+                "SELECT section, fingerprint, analysis FROM lineage_sections WHERE lineage_id = ?",
+                (lineage_id,)
+            ).fetchall()
+            sections = {section: (fingerprint, json.loads(analysis)) for section, fingerprint, analysis in rows}
+            if sections:
+                self._entries.put(lineage_id, sections)
+            return dict(sections)
+
+    def update(self, lineage_id, sections):
+        """Record the latest ``{section: (fingerprint, analysis)}`` results for ``lineage_id``."""
+        if not sections:
+            return
+        with self._lock:
+            merged = dict(self._entries.get(lineage_id) or {})
+            merged.update(sections)
+            self._entries.put(lineage_id, merged)
+            if self._db is not None:
+                try:
+                    db = self._db.get()
+                    db.executemany(
+                        "INSERT OR REPLACE INTO lineage_sections "
+                        "(lineage_id, section, fingerprint, analysis, updated_at) VALUES (?, ?, ?, ?, ?)",
+                        [(lineage_id, section, fingerprint, json.dumps(analysis), time.time())
+                         for section, (fingerprint, analysis) in sections.items()]
+                    )
+                    db.commit()
+                except sqlite3.Error as e:
+                    logger.error(f"Error writing lineage: {str(e)}")
@@ -0,0 +1,156 @@
+import numpy as np
+
+from keywords import KeywordMatcher
+
+# Feedback per section and score tier: (strength, improvement). "{n}" is the
+# number of distinct content keywords found in the section.
+SECTION_FEEDBACK = {
+    'experience': {
+        'strong': ("Strong work experience section with {n} specific achievements and metrics.", None),
+        'fair': (None, "Good work experience section, but could benefit from more specific achievements and metrics."),
+        'weak': (None, "Work experience section needs more detail about responsibilities and achievements.")
+    },
+    'education': {
+        'strong': ("Comprehensive education section with {n} specific academic details.", None),
+        'fair': (None, "Education section is present but could include more details like GPA or coursework."),
+        'weak': (None, "Education section needs more details about your academic background.")
+    },
+    'skills': {
+        'strong': ("Well-organized skills section with {n} specific technical competencies.", None),
+        'fair': (None, "Skills section is present but could be more specific about technical abilities."),
+        'weak': (None, "Skills section needs more specific technical skills and tools.")
+    },
+    'projects': {
+        'strong': ("Strong projects section with {n} specific demonstrations of your work.", None),
+        'fair': (None, "Projects section is present but could include more details about your contributions."),
+        'weak': (None, "Projects section needs more details about your role and contributions.")
+    }
+}
+
+# Recommendations for sections scoring under 8: (section, rule, argument, text).
+# "fewer_than" fires when the section has fewer distinct content keywords than
+# the argument; "missing" fires when no content keyword contains any of the
+# argument substrings.
+RECOMMENDATION_RULES = [
+    ('experience', 'fewer_than', 3, "Enhance work experience with specific achievements like: 'Led team of 5 developers to complete project 2 weeks ahead of schedule', 'Implemented automation that reduced processing time by 60%', 'Increased customer satisfaction scores from 75% to 92%'"),
+    ('experience', 'missing', ('led', 'managed'), "Showcase leadership by adding: 'Managed cross-functional team of 8 members', 'Led daily standups and sprint planning', 'Mentored 3 junior developers'"),
+    ('experience', 'missing', ('metric', '%', '$'), "Add quantifiable metrics: 'Reduced server costs by $15K annually', 'Improved application performance by 45%', 'Increased user engagement by 30%'"),
+    ('education', 'missing', ('gpa',), "Include academic achievements: 'GPA: 3.8/4.0', 'Dean's List 2020-2022', 'Summa Cum Laude'"),
+    ('education', 'fewer_than', 2, "Add academic highlights: 'Relevant Coursework: Data Structures, Algorithms, Machine Learning', 'Senior Project: Developed AI-powered resume analyzer', 'Research Assistant: Published paper on NLP techniques'"),
+    ('education', 'missing', ('honor', 'scholarship'), "Highlight academic recognition: 'Recipient of Computer Science Excellence Scholarship', 'National Merit Scholar', 'Departmental Honors'"),
+    ('skills', 'fewer_than', 5, "Expand technical skills with specific examples: 'Programming: Python (5+ years), Java, JavaScript', 'Cloud: AWS (EC2, S3, Lambda), Azure', 'DevOps: Docker, Kubernetes, Jenkins'"),
+    ('skills', 'missing', ('framework',), "Add framework expertise: 'Web: React, Angular, Vue.js', 'Backend: Django, Flask, Spring Boot', 'Mobile: React Native, Flutter'"),
+    ('skills', 'missing', ('tool', 'platform'), "Include development tools: 'Version Control: Git, GitHub, Bitbucket', 'CI/CD: Jenkins, GitHub Actions', 'Testing: JUnit, Selenium, PyTest'"),
+    ('projects', 'fewer_than', 2, "Add detailed project descriptions: 'Developed full-stack e-commerce platform using React and Node.js', 'Built machine learning model for fraud detection with 95% accuracy', 'Created automated testing framework reducing QA time by 50%'"),
+    ('projects', 'missing', ('impact',), "Showcase project impact: 'Deployed to production serving 10K+ users', 'Reduced server response time from 2s to 200ms', 'Implemented features increasing user retention by 25%'"),
+    ('projects', 'missing', ('contribution', 'role'), "Highlight your role: 'Led backend development and database optimization', 'Implemented RESTful API endpoints', 'Designed and developed user authentication system'")
+]
+
+# Content keywords listed under a section's strengths
+MAX_LISTED_KEYWORDS = 8
+
+
+class LocalScorer:
+    """Score many resumes at once from a document x keyword count matrix.
+
+    Keyword matching is one regex pass per document (``KeywordMatcher``);
+    everything after that, section scores, distinct-keyword counts and the
+    recommendation rules, is computed with array operations over the whole
+    batch. Results have the same ``{"overall_score", "sections"}`` shape as
+    ``combine_analyses``.
+    """
+
+    def __init__(self, matcher=None):
+        self.matcher = matcher or KeywordMatcher()
+        self.sections = list(self.matcher.table)
+        self.keywords = self.matcher.keywords()
+        self._column = {keyword: i for i, keyword in enumerate(self.keywords)}
+
+        # keyword -> section header hits / content hits, as (keywords x sections) weights
+        targets = [self.matcher.targets(keyword) for keyword in self.keywords]
+        shape = (len(self.keywords), len(self.sections))
+        self._header_weights = np.zeros(shape)
+        self._content_weights = np.zeros(shape)
+        for k, keyword_targets in enumerate(targets):
+            for section, metric in keyword_targets:
+                weights = self._header_weights if metric == 'section' else self._content_weights
+                weights[k, self.sections.index(section)] += 1
+        self._content_mask = self._content_weights > 0
+
+        # Keyword columns each "missing" rule looks for
+        self._rule_masks = []
+        for section, rule, argument, _ in RECOMMENDATION_RULES:
+            if rule == 'missing':
+                contains = np.array([any(part in keyword for part in argument) for keyword in self.keywords])
+                self._rule_masks.append(self._content_mask[:, self.sections.index(section)] & contains)
+            else:
+                self._rule_masks.append(None)
+
+    def count_matrix(self, texts):
+        """Return an (n_texts x n_keywords) matrix of keyword occurrence counts."""
+        # Sparse (row, column, count) triplets, scattered into a dense matrix at the end
+        rows = []
+        cols = []
+        values = []
+        for i, text in enumerate(texts):
+            for keyword, count in self.matcher.count_keywords(text).items():
+                rows.append(i)
+                cols.append(self._column[keyword])
+                values.append(count)
+        n, k = len(texts), len(self.keywords)
+        flat = np.asarray(rows, dtype=np.int64) * k + np.asarray(cols, dtype=np.int64)
+        counts = np.bincount(flat, weights=np.asarray(values, dtype=np.float64), minlength=n * k)
+        return counts.reshape(n, k).astype(np.int64)
+
+    def score_batch(self, texts):
+        """Score every text and return a list of ``{"overall_score", "sections"}`` dicts."""
+        counts = self.count_matrix(texts)
+        present = counts > 0
+
+        header_hits = counts @ self._header_weights
+        content_hits = counts @ self._content_weights
+        # Section presence earns up to 10, detailed content a bonus of up to 5, capped at 10
+        scores = np.minimum(10, np.minimum(10, header_hits * 2) + np.minimum(5, content_hits / 2))
+        overall = scores.mean(axis=1)
+        details = present.astype(np.int64) @ self._content_mask.astype(np.int64)
+
+        fired = np.zeros((len(texts), len(RECOMMENDATION_RULES)), dtype=bool)
+        for r, (section, rule, argument, _) in enumerate(RECOMMENDATION_RULES):
+            s = self.sections.index(section)
+            if rule == 'fewer_than':
+                fired[:, r] = details[:, s] < argument
+            else:
+                fired[:, r] = ~present[:, self._rule_masks[r]].any(axis=1)
+            fired[:, r] &= scores[:, s] < 8
+
+        return [self._report(scores[i], overall[i], details[i], present[i], fired[i]) for i in range(len(texts))]
+
+    def score(self, text):
+        """Score a single text."""
+        return self.score_batch([text])[0]
+
+    def _report(self, scores, overall, details, present, fired):
+        sections = {}
+        for s, section in enumerate(self.sections):
+            score = float(scores[s])
+            tier = 'strong' if score >= 8 else 'fair' if score >= 5 else 'weak'
+            strength, improvement = SECTION_FEEDBACK.get(section, {}).get(tier, (None, None))
+
+            strengths = [strength.format(n=int(details[s]))] if strength else []
+            found = [self.keywords[k] for k in np.flatnonzero(present & self._content_mask[:, s])]
+            if found:
+                strengths.append(f"Mentions {', '.join(found[:MAX_LISTED_KEYWORDS])}")
+
+            sections[section] = {
+                "score": round(score, 1),
+                "strengths": "\n".join(strengths),
+                "improvements": improvement or "",
+                "recommendations": "\n".join(
+                    text for r, (rule_section, _, _, text) in enumerate(RECOMMENDATION_RULES)
+                    if rule_section == section and fired[r]
+                )
+            }
+        return {
+            "overall_score": round(float(overall), 1),
+            "sections": sections
+        }
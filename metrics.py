@@ -0,0 +1,200 @@
+import os
+import json
+import time
+import random
+import logging
+import threading
+import contextvars
+from contextlib import contextmanager
+
+logger = logging.getLogger(__name__)
+
+# Fraction of requests whose span timings are written to the log
+TRACE_SAMPLE_RATE = float(os.getenv('TRACE_SAMPLE_RATE', '0.1'))
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+_current_trace = contextvars.ContextVar('current_trace', default=None)
+
+
+def _format_labels(labels):
+    if not labels:
+        return ''
+    escaped = (
+        '{}="{}"'.format(key, str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n'))
+        for key, value in labels
+    )
+    return '{' + ','.join(escaped) + '}'
+
+
+class Counter:
+    """Monotonic counter with optional labels."""
+
+    type = 'counter'
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        # Unlabeled counters are exported as 0 before their first increment
+        self._values = {} if self.labelnames else {(): 0}
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1, **labels):
+        key = tuple((name, labels[name]) for name in self.labelnames)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def samples(self):
+        with self._lock:
+            return [(self.name, key, value) for key, value in self._values.items()]
+
+
+class Histogram:
+    """Cumulative-bucket histogram in the Prometheus style."""
+
+    type = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, **labels):
+        key = tuple((name, labels[name]) for name in self.labelnames)
+        with self._lock:
+            entry = self._values.get(key)
+            if entry is None:
+                entry = self._values[key] = [[0] * len(self.buckets), 0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    entry[0][i] += 1
+            entry[1] += value
+            entry[2] += 1
+
+    def samples(self):
+        samples = []
+        with self._lock:
+            for key, (counts, total, count) in self._values.items():
+                for bound, bucket_count in zip(self.buckets, counts):
+                    samples.append((self.name + '_bucket', key + (('le', repr(bound)),), bucket_count))
+                samples.append((self.name + '_bucket', key + (('le', '+Inf'),), count))
+                samples.append((self.name + '_sum', key, total))
+                samples.append((self.name + '_count', key, count))
+        return samples
+
+
+class MetricsRegistry:
+    """Holds metrics and renders them in the Prometheus text exposition format."""
+
+    def __init__(self):
+        self._metrics = []
+        self._collectors = []
+
+    def counter(self, name, documentation, labelnames=()):
+        metric = Counter(name, documentation, labelnames)
+        self._metrics.append(metric)
+        return metric
+
+    def histogram(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        metric = Histogram(name, documentation, labelnames, buckets)
+        self._metrics.append(metric)
+        return metric
+
+    def register_collector(self, collector):
+        """Register ``collector()`` returning ``(name, type, help, [(labels_dict, value)])`` tuples.
+
+        Collectors are called at scrape time, for values that already live
+        elsewhere (cache counters, client usage, queue depth).
+        """
+        self._collectors.append(collector)
+
+    def render(self):
+        lines = []
+        for metric in self._metrics:
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.type}")
+            for name, labels, value in metric.samples():
+                lines.append(f"{name}{_format_labels(labels)} {value}")
+
+        for collector in self._collectors:
+            try:
+                families = collector()
+            except Exception as e:
+                logger.error(f"Error collecting metrics: {str(e)}")
+                continue
+            for name, metric_type, documentation, samples in families:
+                lines.append(f"# HELP {name} {documentation}")
+                lines.append(f"# TYPE {name} {metric_type}")
+                for labels, value in samples:
+                    lines.append(f"{name}{_format_labels(sorted(labels.items()))} {value}")
+        return '\n'.join(lines) + '\n'
+
+
+registry = MetricsRegistry()
+stage_seconds = registry.histogram(
+    'resume_analyzer_stage_seconds', 'Time spent in each analysis pipeline stage.', ('stage',))
+request_seconds = registry.histogram(
+    'resume_analyzer_request_seconds', 'HTTP request latency.', ('endpoint', 'status'))
+fallback_total = registry.counter(
+    'resume_analyzer_fallback_total', 'Analyses answered by the local analyzer instead of the LLM.')
+structured_output_total = registry.counter(
+    'resume_analyzer_structured_output_total', 'Structured LLM replies by outcome (valid, repaired, fallback).',
+    ('outcome',))
+rate_limited_total = registry.counter(
+    'resume_analyzer_rate_limited_total', 'Requests rejected by the inbound rate limiter.', ('scope',))
+provisional_total = registry.counter(
+    'resume_analyzer_provisional_total', 'Provisional local analyses returned ahead of the LLM result.', ('mode',))
+
+
+@contextmanager
+def span(stage, **attributes):
+    """Time a pipeline stage and attach it to the current request trace."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        duration = time.perf_counter() - start
+        stage_seconds.observe(duration, stage=stage)
+        trace = _current_trace.get()
+        if trace is not None:
+            with trace['lock']:
+                trace['spans'].append(dict(attributes, stage=stage, ms=round(duration * 1000, 2)))
+
+
+def start_trace(name):
+    """Begin collecting spans for a request; returns a token for ``finish_trace``."""
+    trace = {
+        'name': name,
+        'start': time.perf_counter(),
+        'spans': [],
+        'lock': threading.Lock(),
+        'sampled': random.random() < TRACE_SAMPLE_RATE
+    }
+    return _current_trace.set(trace)
+
+
+def finish_trace(token, status):
+    """Record request latency and log the span summary for sampled requests."""
+    trace = _current_trace.get()
+    _current_trace.reset(token)
+    if trace is None:
+        return
+    duration = time.perf_counter() - trace['start']
+    request_seconds.observe(duration, endpoint=trace['name'], status=status)
+    if trace['sampled']:
+        logger.info(json.dumps({
+            'trace': trace['name'],
+            'status': status,
+            'ms': round(duration * 1000, 2),
+            'spans': trace['spans']
+        }))
+
+
+def propagate(func):
+    """Wrap ``func`` so it runs with the caller's trace when submitted to another thread."""
+    context = contextvars.copy_context()
+    return lambda *args, **kwargs: context.run(func, *args, **kwargs)
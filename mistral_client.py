@@ -0,0 +1,274 @@
+import os
+import json
+import random
+import threading
+import time
+import logging
+from email.utils import parsedate_to_datetime
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED, TimeoutError as FutureTimeout
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from circuit_breaker import CircuitBreaker, CLOSED, OPEN
+
+logger = logging.getLogger(__name__)
+
+API_URL = os.getenv('MISTRAL_API_URL', "https://api.mistral.ai/v1/chat/completions")
+
+# Connection pool and retry settings
+MISTRAL_POOL_SIZE = int(os.getenv('MISTRAL_POOL_SIZE', '10'))
+MISTRAL_CONNECT_TIMEOUT = float(os.getenv('MISTRAL_CONNECT_TIMEOUT', '5'))
+MISTRAL_READ_TIMEOUT = float(os.getenv('MISTRAL_READ_TIMEOUT', '30'))
+MISTRAL_MAX_RETRIES = int(os.getenv('MISTRAL_MAX_RETRIES', '3'))
+MISTRAL_BACKOFF_BASE = float(os.getenv('MISTRAL_BACKOFF_BASE', '0.5'))
+MISTRAL_BACKOFF_MAX = float(os.getenv('MISTRAL_BACKOFF_MAX', '8'))
+
+# Hedging: send a duplicate request when the first is slower than the recent p95
+MISTRAL_HEDGE_ENABLED = os.getenv('MISTRAL_HEDGE_ENABLED', 'false').lower() == 'true'
+MISTRAL_HEDGE_PERCENTILE = float(os.getenv('MISTRAL_HEDGE_PERCENTILE', '95'))
+MISTRAL_HEDGE_MIN_DELAY = float(os.getenv('MISTRAL_HEDGE_MIN_DELAY', '1'))
+
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+
+
+class MistralError(Exception):
+    """Raised when the Mistral API does not return a usable response."""
+
+    def __init__(self, message, status_code=None):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+class CircuitOpenError(MistralError):
+    """Raised without contacting Mistral while the circuit breaker is open."""
+
+
+class MistralClient:
+    """Keep-alive Mistral client with timeouts, retries, circuit breaking and token accounting."""
+
+    def __init__(self, api_key, api_url=API_URL, pool_size=MISTRAL_POOL_SIZE,
+                 connect_timeout=MISTRAL_CONNECT_TIMEOUT, read_timeout=MISTRAL_READ_TIMEOUT,
+                 max_retries=MISTRAL_MAX_RETRIES, backoff_base=MISTRAL_BACKOFF_BASE,
+                 backoff_max=MISTRAL_BACKOFF_MAX, breaker=None, hedge=MISTRAL_HEDGE_ENABLED,
+                 hedge_percentile=MISTRAL_HEDGE_PERCENTILE, hedge_min_delay=MISTRAL_HEDGE_MIN_DELAY,
+                 rate_limiter=None):
+        self.api_url = api_url
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.breaker = breaker or CircuitBreaker()
+        self.hedge = hedge
+        self.hedge_percentile = hedge_percentile
+        self.hedge_min_delay = hedge_min_delay
+        self._hedge_executor = None
+        # Optional TokenBucket shared by every outbound call
+        self.rate_limiter = rate_limiter
+
+        # Retries are handled here so Retry-After and the caller's deadline are respected
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=0)
+        self.session = requests.Session()
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        self.session.headers.update({
+            "Authorization": f"Bearer {api_key}",
+            "Content-Type": "application/json"
+        })
+
+        self._lock = threading.Lock()
+        self._usage = {
+            'requests': 0,
+            'retries': 0,
+            'failures': 0,
+            'hedges': 0,
+            'rejected': 0,
+            'throttled': 0,
+            'prompt_tokens': 0,
+            'completion_tokens': 0,
+            'total_tokens': 0
+        }
+
+    def chat(self, payload, deadline=None):
+        """POST a chat completion payload and return the decoded JSON body.
+
+        ``deadline`` is an optional ``time.monotonic()`` value; no request or
+        backoff sleep is allowed to run past it. With hedging enabled, a
+        duplicate request is sent once the first has run longer than the
+        recent latency percentile, and the first success wins.
+        """
+        if self.hedge and self.breaker.state == CLOSED:
+            delay = self.breaker.latency_percentile(self.hedge_percentile)
+            if delay is not None:
+                return self._hedged_chat(payload, deadline, max(delay, self.hedge_min_delay))
+        return self._chat(payload, deadline)
+
+    def available(self):
+        """Return False while the circuit breaker is failing calls fast."""
+        return self.breaker.state != OPEN
+
+    def _chat(self, payload, deadline=None):
+        response = self._post(payload, deadline)
+        result = response.json()
+        self._record_usage(result.get('usage'))
+        return result
+
+    def _hedged_chat(self, payload, deadline, delay):
+        with self._lock:
+            if self._hedge_executor is None:
+                self._hedge_executor = ThreadPoolExecutor(thread_name_prefix='mistral-hedge')
+        primary = self._hedge_executor.submit(self._chat, payload, deadline)
+        try:
+            return primary.result(timeout=delay)
+        except FutureTimeout:
+            pass
+
+        self._record('hedges')
+        logger.info(f"Mistral request slower than {delay:.2f}s; sending hedge request")
+        pending = {primary, self._hedge_executor.submit(self._chat, payload, deadline)}
+        error = None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                try:
+                    # The slower request keeps running; its tokens are still counted
+                    return future.result()
+                except MistralError as e:
+                    error = e
+        raise error
+
+    def stream_chat(self, payload, deadline=None):
+        """Yield content deltas from a streamed chat completion.
+
+        Retries only happen before the first byte is received; once tokens
+        are flowing a failure is raised to the caller.
+        """
+        response = self._post(dict(payload, stream=True), deadline, stream=True)
+        try:
+            for line in response.iter_lines(decode_unicode=True):
+                if deadline is not None and time.monotonic() >= deadline:
+                    self._record('failures')
+                    raise MistralError("Deadline exceeded while streaming Mistral response")
+                if not line or not line.startswith('data:'):
+                    continue
+                data = line[len('data:'):].strip()
+                if data == '[DONE]':
+                    break
+                chunk = json.loads(data)
+                self._record_usage(chunk.get('usage'))
+                for choice in chunk.get('choices', []):
+                    delta = (choice.get('delta') or {}).get('content')
+                    if delta:
+                        yield delta
+        except (requests.ConnectionError, requests.Timeout, ValueError) as e:
+            self._record('failures')
+            raise MistralError(f"Mistral stream failed: {str(e)}")
+        finally:
+            response.close()
+
+    def _post(self, payload, deadline=None, stream=False):
+        attempt = 0
+        while True:
+            read_timeout = self.read_timeout
+            if deadline is not None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self._record('failures')
+                    raise MistralError("Deadline exceeded before Mistral request")
+                read_timeout = min(read_timeout, remaining)
+
+            # Check the breaker first so an open circuit fails fast instead of waiting for tokens
+            if not self.breaker.allow():
+                self._record('rejected')
+                raise CircuitOpenError("Mistral circuit breaker is open")
+
+            if self.rate_limiter is not None and not self.rate_limiter.acquire(deadline):
+                self.breaker.release()
+                self._record('throttled')
+                raise MistralError("Mistral rate limit budget exhausted before the deadline", status_code=429)
+
+            retry_after = None
+            start = time.monotonic()
+            try:
+                self._record('requests')
+                response = self.session.post(
+                    self.api_url,
+                    json=payload,
+                    timeout=(min(self.connect_timeout, read_timeout), read_timeout),
+                    stream=stream
+                )
+                if response.status_code == 200:
+                    self.breaker.record(True, time.monotonic() - start)
+                    return response
+
+                error = MistralError(
+                    f"Mistral API returned {response.status_code}: {response.text[:200]}",
+                    status_code=response.status_code
+                )
+                response.close()
+                if response.status_code not in RETRY_STATUS_CODES:
+                    # Client errors say nothing about the backend's health
+                    self.breaker.record(True)
+                    self._record('failures')
+                    raise error
+                self.breaker.record(False)
+                retry_after = parse_retry_after(response.headers.get('Retry-After'))
+            except (requests.ConnectionError, requests.Timeout) as e:
+                self.breaker.record(False)
+                error = MistralError(f"Mistral request failed: {str(e)}")
+            except requests.RequestException:
+                self.breaker.record(False)
+                raise
+
+            if attempt >= self.max_retries:
+                self._record('failures')
+                raise error
+
+            delay = self._backoff(attempt, retry_after)
+            if deadline is not None and time.monotonic() + delay >= deadline:
+                self._record('failures')
+                raise error
+
+            attempt += 1
+            self._record('retries')
+            logger.warning(f"{error}; retrying in {delay:.2f}s (attempt {attempt}/{self.max_retries})")
+            time.sleep(delay)
+
+    def usage(self):
+        """Return a snapshot of request and token counters."""
+        with self._lock:
+            return dict(self._usage)
+
+    def _backoff(self, attempt, retry_after=None):
+        # Full jitter, but never sooner than the server asked us to wait
+        delay = random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+        if retry_after is not None:
+            delay = max(delay, retry_after)
+        return delay
+
+    def _record(self, counter, amount=1):
+        with self._lock:
+            self._usage[counter] += amount
+
+    def _record_usage(self, usage):
+        if not usage:
+            return
+        with self._lock:
+            for key in ('prompt_tokens', 'completion_tokens', 'total_tokens'):
+                self._usage[key] += usage.get(key) or 0
+
+
+def parse_retry_after(value):
+    """Parse a Retry-After header given either in seconds or as an HTTP date."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+        return max(0.0, retry_at.timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
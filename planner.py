@@ -0,0 +1,75 @@
+import os
+import re
+
+# Prompt planning settings (all sizes are estimated tokens)
+PROMPT_PACKING_ENABLED = os.getenv('PROMPT_PACKING_ENABLED', 'true').lower() == 'true'
+SECTION_TOKEN_BUDGET = int(os.getenv('SECTION_TOKEN_BUDGET', '600'))
+SMALL_SECTION_TOKENS = int(os.getenv('SMALL_SECTION_TOKENS', '200'))
+PACKED_CALL_TOKEN_BUDGET = int(os.getenv('PACKED_CALL_TOKEN_BUDGET', '800'))
+
+# Rough average for English text with Mistral's tokenizer
+CHARS_PER_TOKEN = 4
+
+SENTENCE_END = re.compile(r'[.!?;](?=\s)')
+
+
+def estimate_tokens(text):
+    """Cheaply estimate the token count of ``text``."""
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+def trim_section(text, budget=SECTION_TOKEN_BUDGET):
+    """Trim ``text`` to roughly ``budget`` tokens, cutting at a sentence boundary when possible."""
+    if estimate_tokens(text) <= budget:
+        return text
+    limit = budget * CHARS_PER_TOKEN
+    cut = text[:limit]
+    boundaries = [match.end() for match in SENTENCE_END.finditer(cut)]
+    # Only honor the sentence boundary if it keeps most of the budget
+    if boundaries and boundaries[-1] > limit // 2:
+        cut = cut[:boundaries[-1]]
+    return cut.rstrip() + ' ...'
+
+
+def plan_calls(sections, budget=SECTION_TOKEN_BUDGET, small=SMALL_SECTION_TOKENS,
+               packed_budget=PACKED_CALL_TOKEN_BUDGET, packing=PROMPT_PACKING_ENABLED):
+    """Group sections into LLM calls.
+
+    Returns a list of calls, each a list of ``(section_name, text)`` pairs.
+    Oversized sections are trimmed to ``budget`` and sent alone; sections under
+    ``small`` tokens are packed together while the call stays within
+    ``packed_budget``.
+    """
+    calls = []
+    pack = []
+    pack_tokens = 0
+    for section_name, text in sections.items():
+        if not text:
+            continue
+        text = trim_section(text, budget)
+        tokens = estimate_tokens(text)
+        if not packing or tokens >= small:
+            calls.append([(section_name, text)])
+            continue
+        if pack and pack_tokens + tokens > packed_budget:
+            calls.append(pack)
+            pack, pack_tokens = [], 0
+        pack.append((section_name, text))
+        pack_tokens += tokens
+    if pack:
+        calls.append(pack)
+    return calls
+
+
+def split_packed_response(response, section_names):
+    """Split a multi-section reply on its ``### NAME`` headers into per-section analyses."""
+    names = '|'.join(re.escape(name) for name in section_names)
+    headers = list(re.finditer(rf'^[ \t]*#+[ \t]*({names})[ \t:]*$', response, re.IGNORECASE | re.MULTILINE))
+    analyses = {}
+    for i, header in enumerate(headers):
+        end = headers[i + 1].start() if i + 1 < len(headers) else len(response)
+        analysis = response[header.end():end].strip()
+        section_name = header.group(1).lower()
+        if analysis and section_name not in analyses:
+            analyses[section_name] = analysis
+    return analyses
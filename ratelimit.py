@@ -0,0 +1,173 @@
+import os
+import time
+import hashlib
+import logging
+import threading
+
+from storage import SQLiteConnection
+
+logger = logging.getLogger(__name__)
+
+# Rate limiting settings
+RATE_LIMIT_ENABLED = os.getenv('RATE_LIMIT_ENABLED', 'true').lower() == 'true'
+# 'memory' keeps buckets per process; 'sqlite' shares them between workers
+RATE_LIMIT_BACKEND = os.getenv('RATE_LIMIT_BACKEND', 'memory')
+RATE_LIMIT_DB_PATH = os.getenv('RATE_LIMIT_DB_PATH', 'instance/rate_limits.sqlite3')
+# Inbound analysis requests per client (API key, or IP when no key is sent)
+CLIENT_RATE_PER_MINUTE = float(os.getenv('CLIENT_RATE_PER_MINUTE', '30'))
+CLIENT_BURST = float(os.getenv('CLIENT_BURST', '10'))
+# Comma-separated API keys that get their own quota; other clients are limited by IP
+CLIENT_API_KEYS = os.getenv('CLIENT_API_KEYS', '')
+# Outbound Mistral calls across the whole deployment (0 disables the limit)
+LLM_RATE_PER_SECOND = float(os.getenv('LLM_RATE_PER_SECOND', '5'))
+LLM_BURST = float(os.getenv('LLM_BURST', '10'))
+
+# Buckets idle this long are full again and can be dropped
+IDLE_BUCKET_SECONDS = 3600
+PRUNE_EVERY = 1000
+
+
+def _refill(tokens, updated, now, rate, capacity):
+    return min(capacity, tokens + max(0.0, now - updated) * rate)
+
+
+class MemoryBucketStore:
+    """Token bucket state held in this process."""
+
+    def __init__(self):
+        self._buckets = {}
+        self._lock = threading.Lock()
+        self._takes = 0
+
+    def take(self, key, rate, capacity, cost=1, force=False):
+        """Try to take ``cost`` tokens; return ``(allowed, retry_after_seconds)``.
+
+        With ``force`` the tokens are always taken, leaving the bucket in debt if needed.
+        """
+        now = time.time()
+        with self._lock:
+            tokens, updated = self._buckets.get(key, (capacity, now))
+            tokens = _refill(tokens, updated, now, rate, capacity)
+            allowed = force or tokens >= cost
+            if allowed:
+                tokens -= cost
+            self._buckets[key] = (tokens, now)
+
+            self._takes += 1
+            if self._takes % PRUNE_EVERY == 0:
+                cutoff = now - IDLE_BUCKET_SECONDS
+                self._buckets = {k: v for k, v in self._buckets.items() if v[1] >= cutoff}
+        return allowed, 0.0 if allowed else (cost - tokens) / rate
+
+
+class SQLiteBucketStore:
+    """Token bucket state in a SQLite file shared by every worker process."""
+
+    def __init__(self, path=RATE_LIMIT_DB_PATH):
+        self.path = path
+        # Autocommit mode so each take runs in its own BEGIN IMMEDIATE transaction
+        self._db = SQLiteConnection(path, isolation_level=None)
+        db = self._db.get()
+        db.execute("PRAGMA journal_mode=WAL")
+        db.execute(
+            "CREATE TABLE IF NOT EXISTS rate_limit_buckets ("
+            "key TEXT PRIMARY KEY, tokens REAL NOT NULL, updated REAL NOT NULL)"
+        )
+        self._lock = threading.Lock()
+        self._takes = 0
+
+    def take(self, key, rate, capacity, cost=1, force=False):
+        """Try to take ``cost`` tokens; return ``(allowed, retry_after_seconds)``.
+
+        With ``force`` the tokens are always taken, leaving the bucket in debt if needed.
+        """
+        now = time.time()
+        with self._lock:
+            db = self._db.get()
+            db.execute("BEGIN IMMEDIATE")
+            try:
+                row = db.execute(
+                    "SELECT tokens, updated FROM rate_limit_buckets WHERE key = ?", (key,)
+                ).fetchone()
+                tokens = _refill(*(row or (capacity, now)), now, rate, capacity)
+                allowed = force or tokens >= cost
+                if allowed:
+                    tokens -= cost
+                db.execute(
+                    "INSERT OR REPLACE INTO rate_limit_buckets (key, tokens, updated) VALUES (?, ?, ?)",
+                    (key, tokens, now)
+                )
+                self._takes += 1
+                if self._takes % PRUNE_EVERY == 0:
+                    db.execute("DELETE FROM rate_limit_buckets WHERE updated < ?", (now - IDLE_BUCKET_SECONDS,))
+                db.execute("COMMIT")
+            except Exception:
+                db.execute("ROLLBACK")
+                raise
+        return allowed, 0.0 if allowed else (cost - tokens) / rate
+
+
+def make_store(backend=RATE_LIMIT_BACKEND, path=RATE_LIMIT_DB_PATH):
+    """Create the bucket store named by ``backend``."""
+    if backend == 'sqlite':
+        return SQLiteBucketStore(path)
+    if backend != 'memory':
+        logger.warning(f"Unknown rate limit backend {backend!r}; using memory")
+    return MemoryBucketStore()
+
+
+class TokenBucket:
+    """A named token bucket refilled at ``rate`` tokens per second up to ``capacity``."""
+
+    def __init__(self, store, key, rate, capacity):
+        self.store = store
+        self.key = key
+        self.rate = rate
+        self.capacity = capacity
+
+    def try_acquire(self, cost=1):
+        """Take tokens without waiting; return ``(allowed, retry_after_seconds)``."""
+        if self.rate <= 0:
+            return True, 0.0
+        return self.store.take(self.key, self.rate, self.capacity, cost)
+
+    def acquire(self, deadline=None, cost=1):
+        """Wait for tokens; return False if they will not arrive before ``deadline``."""
+        while True:
+            allowed, retry_after = self.try_acquire(cost)
+            if allowed:
+                return True
+            if deadline is not None and time.monotonic() + retry_after >= deadline:
+                return False
+            time.sleep(retry_after)
+
+
+class ClientRateLimiter:
+    """Per-client token buckets for inbound requests."""
+
+    def __init__(self, store, rate_per_minute=CLIENT_RATE_PER_MINUTE, burst=CLIENT_BURST, api_keys=CLIENT_API_KEYS):
+        self.store = store
+        self.rate = rate_per_minute / 60.0
+        self.burst = burst
+        self.api_keys = {key.strip() for key in api_keys.split(',') if key.strip()}
+
+    def client_id(self, api_key, remote_addr):
+        """Return the bucket id for a request: a configured API key, otherwise the client IP.
+
+        Unknown keys are ignored so that a fresh header per request cannot
+        mint a fresh quota.
+        """
+        if api_key and api_key in self.api_keys:
+            return 'key:' + hashlib.sha256(api_key.encode('utf-8')).hexdigest()[:16]
+        return 'ip:' + (remote_addr or 'unknown')
+
+    def check(self, client_id, cost=1):
+        """Return ``(allowed, retry_after_seconds)`` for one request from ``client_id``."""
+        if self.rate <= 0:
+            return True, 0.0
+        return self.store.take(f"client:{client_id}", self.rate, self.burst, cost)
+
+    def charge(self, client_id, cost):
+        """Take ``cost`` tokens from an already admitted request, going into debt if needed."""
+        if self.rate > 0 and cost > 0:
+            self.store.take(f"client:{client_id}", self.rate, self.burst, cost, force=True)
@@ -0,0 +1,152 @@
+import os
+import json
+import time
+import logging
+import threading
+
+from storage import SQLiteConnection
+
+logger = logging.getLogger(__name__)
+
+# Result store settings
+RESULT_STORE_ENABLED = os.getenv('RESULT_STORE_ENABLED', 'true').lower() == 'true'
+RESULT_STORE_PATH = os.getenv('RESULT_STORE_PATH', 'instance/results.sqlite3')
+RESULTS_PAGE_SIZE = int(os.getenv('RESULTS_PAGE_SIZE', '50'))
+RESULTS_MAX_PAGE_SIZE = 500
+
+SCHEMA = [
+    "CREATE TABLE IF NOT EXISTS analyses ("
+    "id INTEGER PRIMARY KEY AUTOINCREMENT, document_sha256 TEXT NOT NULL, filename TEXT, "
+    "lineage_id TEXT, overall_score REAL, created_at REAL NOT NULL, result TEXT NOT NULL)",
+    # Every index implicitly ends with the rowid, so equality lookups come back in id order
+    "CREATE INDEX IF NOT EXISTS idx_analyses_created ON analyses (created_at)",
+    "CREATE INDEX IF NOT EXISTS idx_analyses_score ON analyses (overall_score)",
+    "CREATE INDEX IF NOT EXISTS idx_analyses_document ON analyses (document_sha256)",
+    "CREATE INDEX IF NOT EXISTS idx_analyses_lineage ON analyses (lineage_id)",
+    "CREATE TABLE IF NOT EXISTS section_scores ("
+    "analysis_id INTEGER NOT NULL REFERENCES analyses (id) ON DELETE CASCADE, section TEXT NOT NULL, "
+    "score REAL, PRIMARY KEY (analysis_id, section))",
+    "CREATE INDEX IF NOT EXISTS idx_section_scores ON section_scores (section, score)"
+]
+
+
+class ResultStore:
+    """SQLite store of finished analyses with indexed, paginated queries.
+
+    Each analysis is stored once as JSON, with its overall score and
+    per-section scores in indexed columns so reporting queries never need to
+    decode or recompute results.
+    """
+
+    def __init__(self, path=RESULT_STORE_PATH):
+        self.path = path
+        self._db = SQLiteConnection(path)
+        self._lock = threading.Lock()
+        with self._lock:
+            db = self._db.get()
+            db.execute("PRAGMA journal_mode=WAL")
+            for statement in SCHEMA:
+                db.execute(statement)
+            db.commit()
+
+    def record(self, document_sha256, analysis, filename=None, lineage_id=None):
+        """Store a finished ``{"overall_score", "sections"}`` analysis and return its id."""
+        sections = analysis.get('sections') or {}
+        with self._lock:
+            db = self._db.get()
+            cursor = db.execute(
+                "INSERT INTO analyses (document_sha256, filename, lineage_id, overall_score, created_at, result) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (document_sha256, filename, lineage_id, analysis.get('overall_score'), time.time(), json.dumps(analysis))
+            )
+            db.executemany(
+                "INSERT INTO section_scores (analysis_id, section, score) VALUES (?, ?, ?)",
+                [(cursor.lastrowid, name, section.get('score')) for name, section in sections.items()]
+            )
+            db.commit()
+            return cursor.lastrowid
+
+    def get(self, analysis_id):
+        """Return the full stored record for ``analysis_id``, or ``None``."""
+        with self._lock:
+            row = self._db.get().execute(
+                "SELECT id, document_sha256, filename, lineage_id, overall_score, created_at, result "
+                "FROM analyses WHERE id = ?", (analysis_id,)
+            ).fetchone()
+        if row is None:
+            return None
+        record = self._summary(row[:6], {})
+        record['result'] = json.loads(row[6])
+        record['section_scores'] = {
+            name: section.get('score') for name, section in record['result'].get('sections', {}).items()
+        }
+        return record
+
+    def query(self, min_score=None, max_score=None, since=None, until=None, document_sha256=None,
+              lineage_id=None, section=None, section_min=None, section_max=None, cursor=None,
+              limit=RESULTS_PAGE_SIZE):
+        """Return one page of summaries, newest first, and the cursor for the next page.
+
+        ``since``/``until`` are Unix timestamps. ``cursor`` is the ``next_cursor``
+        of the previous page (keyset pagination on the id).
+        """
+        limit = max(1, min(limit, RESULTS_MAX_PAGE_SIZE))
+        clauses = []
+        params = []
+        for clause, value in (
+            ("a.overall_score >= ?", min_score),
+            ("a.overall_score <= ?", max_score),
+            ("a.created_at >= ?", since),
+            ("a.created_at < ?", until),
+            ("a.document_sha256 = ?", document_sha256),
+            ("a.lineage_id = ?", lineage_id),
+            ("a.id < ?", cursor)
+        ):
+            if value is not None:
+                clauses.append(clause)
+                params.append(value)
+        if section is not None:
+            section_clauses = ["section = ?"]
+            params.append(section)
+            for clause, value in (("score >= ?", section_min), ("score <= ?", section_max)):
+                if value is not None:
+                    section_clauses.append(clause)
+                    params.append(value)
+            clauses.append(
+                f"a.id IN (SELECT analysis_id FROM section_scores WHERE {' AND '.join(section_clauses)})"
+            )
+
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        with self._lock:
+            db = self._db.get()
+            rows = db.execute(
+                "SELECT a.id, a.document_sha256, a.filename, a.lineage_id, a.overall_score, a.created_at "
+                f"FROM analyses a {where} ORDER BY a.id DESC LIMIT ?",
+                params + [limit + 1]
+            ).fetchall()
+            page = rows[:limit]
+            scores = {}
+            if page:
+                ids = [row[0] for row in page]
+                for analysis_id, name, score in db.execute(
+                    f"SELECT analysis_id, section, score FROM section_scores "
+                    f"WHERE analysis_id IN ({','.join('?' * len(ids))})", ids
+                ):
+                    scores.setdefault(analysis_id, {})[name] = score
+
+        return {
+            'results': [self._summary(row, scores.get(row[0], {})) for row in page],
+            'next_cursor': page[-1][0] if len(rows) > limit else None
+        }
+
+    def _summary(self, row, section_scores):
+        analysis_id, document_sha256, filename, lineage_id, overall_score, created_at = row
+        return {
+            'id': analysis_id,
+            'sha256': document_sha256,
+            'filename': filename,
+            'lineage_id': lineage_id,
+            'overall_score': overall_score,
+            'section_scores': section_scores,
+            'created_at': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime(created_at))
+        }
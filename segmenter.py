@@ -0,0 +1,123 @@
+import os
+import re
+import json
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Header vocabulary: section name -> words that introduce that section
+DEFAULT_SECTION_HEADERS = {
+    'experience': ['experience', 'work history', 'employment'],
+    'education': ['education', 'academic', 'degree'],
+    'skills': ['skills', 'technical', 'proficient'],
+    'projects': ['projects', 'portfolio', 'work samples']
+}
+
+# A line is treated as a header when it has at most this many words
+MAX_HEADER_WORDS = int(os.getenv('SECTION_MAX_HEADER_WORDS', '4'))
+# After a leading keyword a header line may carry up to two more words
+# ("Technical Skills", "Skills & Tools:"), but not a job title and employer
+HEADER_TAIL = re.compile(r'(?:\s+(?:[&/+]\s+)?\w+){0,2}\W*')
+# Keywords that usually qualify another word ("Technical Lead", "Portfolio
+# Manager"). Next to other words they only start a section on a header-form
+# line: ALL CAPS or ending with a colon.
+HEADER_MODIFIERS = {'technical', 'academic', 'proficient', 'portfolio', 'degree'}
+# Optional JSON file with the same shape as DEFAULT_SECTION_HEADERS
+SECTION_HEADERS_FILE = os.getenv('SECTION_HEADERS_FILE', '')
+
+
+def load_section_headers(path=SECTION_HEADERS_FILE):
+    """Return the header vocabulary from ``path``, or the defaults if unset."""
+    if not path:
+        return DEFAULT_SECTION_HEADERS
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+class SectionSegmenter:
+    """Split resume text into sections with one pass of a precompiled header pattern.
+
+    A line of up to ``max_header_words`` words starts a new section when it
+    ends with a colon, starts with a header keyword followed by at most two
+    words, or is a Title Case line ending with a keyword ("Professional
+    Experience"). Modifier keywords such as "technical" or "portfolio" only
+    count on their own or on an ALL CAPS line, so job titles like "Technical
+    Lead" and "Portfolio Manager" stay body text. The
+    last keyword on a header line decides the section, so "Academic
+    Projects" is a projects header. Text without such header lines
+    (for example already whitespace-collapsed text) falls back to using the
+    first inline keyword hit of each section as its start. Repeated headers
+    for the same section are joined.
+    """
+
+    def __init__(self, headers=None, max_header_words=MAX_HEADER_WORDS, modifiers=HEADER_MODIFIERS):
+        self.headers = headers or load_section_headers()
+        self.max_header_words = max_header_words
+        self.modifiers = {modifier.lower() for modifier in modifiers}
+        self._keyword_sections = {}
+        for section_name, keywords in self.headers.items():
+            for keyword in keywords:
+                self._keyword_sections[keyword.lower()] = section_name
+
+        # Longest keywords first so "work history" wins over shorter overlaps
+        keywords = sorted(self._keyword_sections, key=len, reverse=True)
+        self._pattern = re.compile(
+            r'\b(' + '|'.join(r'\s+'.join(map(re.escape, keyword.split())) for keyword in keywords) + r')\b',
+            re.IGNORECASE
+        )
+
+    def find_headers(self, text):
+        """Return ``(offset, section_name)`` pairs for every section start in ``text``."""
+        line_headers = {}
+        first_hits = {}
+        has_lines = '\n' in text
+        for match in self._pattern.finditer(text):
+            section_name = self._keyword_sections[' '.join(match.group(1).lower().split())]
+            first_hits.setdefault(section_name, match.start())
+
+            if not has_lines:
+                continue
+            line_start = text.rfind('\n', 0, match.start()) + 1
+            line_end = text.find('\n', match.end())
+            line = text[line_start:line_end if line_end != -1 else len(text)]
+            if self.is_header_line(line, match.start() - line_start, match.end() - line_start):
+                # Later keywords on the same line overwrite earlier ones
+                line_headers[line_start] = section_name
+
+        if line_headers:
+            return sorted(line_headers.items())
+        return sorted((offset, section_name) for section_name, offset in first_hits.items())
+
+    def is_header_line(self, line, keyword_start, keyword_end):
+        """Return True if ``line``, with a keyword at ``keyword_start:keyword_end``, is a section header."""
+        words = line.split()
+        if len(words) > self.max_header_words:
+            return False
+        if line.rstrip().endswith(':'):
+            return True
+
+        before = line[:keyword_start]
+        after = line[keyword_end:]
+        keyword = ' '.join(line[keyword_start:keyword_end].lower().split())
+        if keyword in self.modifiers and len(words) > 1 and not line.isupper():
+            return False
+        if not re.search(r'\w', before):
+            return bool(HEADER_TAIL.fullmatch(after))
+        if not re.search(r'\w', after):
+            return all(word[0].isupper() for word in before.split() if word[0].isalpha())
+        return False
+
+    def segment(self, text):
+        """Return a dict of section name -> section text (``None`` when absent)."""
+        spans = {section_name: [] for section_name in self.headers}
+        headers = self.find_headers(text)
+        for i, (start, section_name) in enumerate(headers):
+            end = headers[i + 1][0] if i + 1 < len(headers) else len(text)
+            span = text[start:end].strip()
+            if span:
+                spans[section_name].append(span)
+
+        return {
+            section_name: '\n'.join(parts) if parts else None
+            for section_name, parts in spans.items()
+        }
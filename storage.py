@@ -0,0 +1,47 @@
+import os
+import sqlite3
+from collections import OrderedDict
+
+# Seconds a connection waits for another process's write lock
+SQLITE_TIMEOUT_SECONDS = float(os.getenv('SQLITE_TIMEOUT_SECONDS', '5'))
+
+
+class SQLiteConnection:
+    """SQLite connection opened on first use and reopened in every forked process.
+
+    Connections must not be shared across a fork (gunicorn --preload), so
+    ``get()`` opens a new one whenever the process id changes. Extra keyword
+    arguments are passed to ``sqlite3.connect``.
+    """
+
+    def __init__(self, path, **options):
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        self.path = path
+        self.options = options
+        self._db = None
+        self._pid = None
+
+    def get(self):
+        if self._pid != os.getpid():
+            self._db = sqlite3.connect(self.path, timeout=SQLITE_TIMEOUT_SECONDS, check_same_thread=False,
+                                       **self.options)
+            self._pid = os.getpid()
+        return self._db
+
+
+class LRUDict(OrderedDict):
+    """Ordered dict that keeps at most ``max_entries``, dropping the least recently used."""
+
+    def __init__(self, max_entries):
+        super().__init__()
+        self.max_entries = max_entries
+
+    def put(self, key, value):
+        """Store ``value`` as the most recent entry and return how many entries were evicted."""
+        self[key] = value
+        self.move_to_end(key)
+        evicted = 0
+        while len(self) > self.max_entries:
+            self.popitem(last=False)
+            evicted += 1
+        return evicted
@@ -0,0 +1,104 @@
+import re
+import json
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+LIST_FIELDS = ('strengths', 'improvements', 'recommendations')
+
+# Shape the model is asked to return for one section
+ANALYSIS_SCHEMA = """{
+  "score": <integer 1-10>,
+  "strengths": [<2-3 specific points>],
+  "improvements": [<2-3 specific points>],
+  "recommendations": [<2-3 specific recommendations>]
+}"""
+
+CODE_FENCE = re.compile(r'^\s*```(?:json)?\s*|\s*```\s*$', re.IGNORECASE)
+
+
+class AnalysisFormatError(ValueError):
+    """Raised when a structured reply does not match the analysis schema."""
+
+
+def loads(text):
+    """Parse JSON with orjson when it is installed."""
+    if orjson is not None:
+        return orjson.loads(text)
+    return json.loads(text)
+
+
+def validate_analysis(data):
+    """Check one section's analysis against the schema and return it normalized."""
+    if not isinstance(data, dict):
+        raise AnalysisFormatError("analysis must be a JSON object")
+
+    score = data.get('score')
+    if isinstance(score, str) and score.strip().isdigit():
+        score = int(score)
+    if isinstance(score, float) and score.is_integer():
+        score = int(score)
+    if isinstance(score, bool) or not isinstance(score, int) or not 1 <= score <= 10:
+        raise AnalysisFormatError(f"score must be an integer from 1 to 10, got {data.get('score')!r}")
+
+    analysis = {'score': score}
+    for field in LIST_FIELDS:
+        value = data.get(field)
+        if isinstance(value, str):
+            value = [value]
+        if not isinstance(value, list) or not all(isinstance(item, str) for item in value):
+            raise AnalysisFormatError(f"{field} must be a list of strings")
+        analysis[field] = [item.strip() for item in value if item.strip()]
+        if not analysis[field]:
+            raise AnalysisFormatError(f"{field} must not be empty")
+    return analysis
+
+
+def _load_object(text):
+    try:
+        data = loads(CODE_FENCE.sub('', text))
+    except ValueError as e:
+        raise AnalysisFormatError(f"invalid JSON: {str(e)}")
+    if not isinstance(data, dict):
+        raise AnalysisFormatError("reply must be a JSON object")
+    return data
+
+
+def parse_analysis(text):
+    """Parse and validate a single-section JSON reply."""
+    return validate_analysis(_load_object(text))
+
+
+def parse_packed_analyses(text, section_names):
+    """Parse a multi-section JSON reply keyed by section name.
+
+    Sections that are missing or invalid are left out so the caller can
+    retry them on their own; a reply with no valid section is an error.
+    """
+    data = {str(key).lower(): value for key, value in _load_object(text).items()}
+    analyses = {}
+    for section_name in section_names:
+        try:
+            analyses[section_name] = validate_analysis(data.get(section_name))
+        except AnalysisFormatError:
+            continue
+    if not analyses:
+        raise AnalysisFormatError("reply contains no valid section analysis")
+    return analyses
+
+
+def dump_analysis(analysis):
+    """Serialize a validated analysis for caching and ``parse_section_analysis``."""
+    return json.dumps(analysis, ensure_ascii=False)
+
+
+def build_repair_payload(payload, reply, error):
+    """Extend ``payload`` with the invalid reply and a request to correct it."""
+    messages = list(payload["messages"]) + [
+        {"role": "assistant", "content": reply},
+        {"role": "user", "content": f"That reply was not valid: {error}. "
+                                    "Respond again with only the corrected JSON object, with no other text."}
+    ]
+    return dict(payload, messages=messages)
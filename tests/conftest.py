@@ -0,0 +1,10 @@
+import os
+import sys
+
+# Keep the suite offline and away from the SQLite stores under instance/
+os.environ.setdefault('MISTRAL_API_KEY', '')
+os.environ.setdefault('RESULT_STORE_ENABLED', 'false')
+os.environ.setdefault('RATE_LIMIT_ENABLED', 'false')
+os.environ.setdefault('ANALYSIS_CACHE_ENABLED', 'false')
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
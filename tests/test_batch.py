@@ -0,0 +1,28 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from batch import run_batch
+
+RESUME = "EXPERIENCE\nLed a team of 5 developers\nSKILLS\nPython, Docker\n"
+
+
+def write(tmp_path, name, text):
+    path = tmp_path / name
+    path.write_text(text)
+    return name, str(path)
+
+
+def test_byte_duplicates_of_a_text_duplicate_are_reported(tmp_path):
+    # b differs from a only in whitespace; c is byte-identical to b
+    documents = [
+        write(tmp_path, 'a.txt', RESUME),
+        write(tmp_path, 'b.txt', RESUME + "   "),
+        write(tmp_path, 'c.txt', RESUME + "   ")
+    ]
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        records = {record['file']: record for record in run_batch(documents, local_only=True, extract_pool=pool)}
+
+    assert set(records) == {'a.txt', 'b.txt', 'c.txt'}
+    assert 'duplicate_of' not in records['a.txt']
+    assert records['b.txt']['duplicate_of'] == 'a.txt'
+    assert records['c.txt']['duplicate_of'] == 'a.txt'
+    assert records['c.txt']['analysis'] == records['a.txt']['analysis']
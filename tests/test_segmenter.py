@@ -0,0 +1,63 @@
+from segmenter import SectionSegmenter
+
+segmenter = SectionSegmenter()
+
+
+def test_job_titles_with_modifier_keywords_stay_in_experience():
+    text = (
+        "Experience\n"
+        "Technical Lead\n"
+        "Acme Corp, 2019-2023\n"
+        "Portfolio Manager\n"
+        "Globex, 2015-2019\n"
+        "Skills\n"
+        "Python, Docker\n"
+    )
+    sections = segmenter.segment(text)
+
+    assert sections['experience'] == (
+        "Experience\nTechnical Lead\nAcme Corp, 2019-2023\nPortfolio Manager\nGlobex, 2015-2019"
+    )
+    assert sections['skills'] == "Skills\nPython, Docker"
+    assert sections['projects'] is None
+
+
+def test_job_title_with_employer_is_not_a_header():
+    sections = segmenter.segment("EXPERIENCE\nTechnical Lead, Acme\n- Built pipelines\nEducation\nBSc\n")
+
+    assert sections['experience'] == "EXPERIENCE\nTechnical Lead, Acme\n- Built pipelines"
+    assert sections['skills'] is None
+
+
+def test_header_forms():
+    text = (
+        "Professional Experience\n"
+        "Engineer at Acme\n"
+        "TECHNICAL SKILLS\n"
+        "Python\n"
+        "Academic Projects\n"
+        "Resume analyzer\n"
+        "Degree:\n"
+        "BSc Computer Science\n"
+    )
+    sections = segmenter.segment(text)
+
+    assert sections['experience'] == "Professional Experience\nEngineer at Acme"
+    assert sections['skills'] == "TECHNICAL SKILLS\nPython"
+    assert sections['projects'] == "Academic Projects\nResume analyzer"
+    assert sections['education'] == "Degree:\nBSc Computer Science"
+
+
+def test_header_noun_with_short_tail():
+    sections = segmenter.segment("Skills & Tools\nPython\nEmployment History\nAcme\n")
+
+    assert sections['skills'] == "Skills & Tools\nPython"
+    assert sections['experience'] == "Employment History\nAcme"
+
+
+def test_text_without_line_breaks_falls_back_to_first_hits():
+    sections = segmenter.segment("Experience at Acme education BSc skills Python")
+
+    assert sections['experience'] == "Experience at Acme"
+    assert sections['education'] == "education BSc"
+    assert sections['skills'] == "skills Python"
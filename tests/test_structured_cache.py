@@ -0,0 +1,59 @@
+import json
+
+import pytest
+
+import app
+from analysis_cache import AnalysisCache
+from lineage import LineageStore
+
+VALID = json.dumps({
+    "score": 7,
+    "strengths": ["Clear list of tools"],
+    "improvements": ["Group skills by area"],
+    "recommendations": ["Add years of experience per skill"]
+})
+
+
+@pytest.fixture
+def llm(monkeypatch):
+    """Replace the Mistral client with canned replies and count the calls."""
+    calls = []
+    replies = []
+
+    def chat(payload, deadline=None):
+        calls.append(payload)
+        return {"choices": [{"message": {"content": replies.pop(0) if replies else "not json"}}]}
+
+    monkeypatch.setattr(app, 'STRUCTURED_OUTPUT_ENABLED', True)
+    monkeypatch.setattr(app, 'ANALYSIS_CACHE_ENABLED', True)
+    monkeypatch.setattr(app, 'analysis_cache', AnalysisCache(path=''))
+    monkeypatch.setattr(app, 'lineage_store', LineageStore(path=''))
+    monkeypatch.setattr(app.mistral_client, 'chat', chat)
+    return calls, replies
+
+
+def test_invalid_reply_after_repair_is_not_cached(llm):
+    calls, replies = llm
+    replies.extend(["not json", "still not json"])
+
+    assert app.analyze_section('skills', "Python, Docker") == "still not json"
+    assert len(calls) == 2
+
+    replies.append(VALID)
+    assert json.loads(app.analyze_section('skills', "Python, Docker"))['score'] == 7
+    assert len(calls) == 3
+
+
+def test_valid_reply_is_cached(llm):
+    calls, replies = llm
+    replies.append(VALID)
+
+    first = app.analyze_section('skills', "Python, Docker")
+    assert app.analyze_section('skills', "Python, Docker") == first
+    assert len(calls) == 1
+
+
+def test_invalid_reply_is_not_kept_in_lineage(llm):
+    app.analyze_resume("SKILLS\nPython, Docker\n", lineage_id='candidate-1')
+
+    assert app.lineage_store.get('candidate-1') == {}
@@ -0,0 +1,81 @@
+import io
+import os
+import hashlib
+import shutil
+import tempfile
+import logging
+
+from flask import Request
+from werkzeug.datastructures import FileStorage
+from werkzeug.exceptions import RequestEntityTooLarge
+
+logger = logging.getLogger(__name__)
+
+UPLOAD_FOLDER = 'instance/uploads'
+os.makedirs(UPLOAD_FOLDER, exist_ok=True)
+
+# Uploads stay in memory up to this size, then spill to a file in UPLOAD_FOLDER
+UPLOAD_SPOOL_MAX_MEMORY = int(os.getenv('UPLOAD_SPOOL_MAX_MEMORY', str(1024 * 1024)))
+# Hard cap on a single uploaded file, enforced while the request body is read
+UPLOAD_MAX_BYTES = int(os.getenv('UPLOAD_MAX_BYTES', str(16 * 1024 * 1024)))
+
+COPY_CHUNK_SIZE = 64 * 1024
+
+
+class UploadSpool(tempfile.SpooledTemporaryFile):
+    """Spooled temporary file that refuses to grow past ``max_bytes``."""
+
+    def __init__(self, max_bytes=UPLOAD_MAX_BYTES, max_size=UPLOAD_SPOOL_MAX_MEMORY, dir=UPLOAD_FOLDER):
+        super().__init__(max_size=max_size, dir=dir)
+        self.max_bytes = max_bytes
+        self.written = 0
+
+    def write(self, s):
+        self.written += len(s)
+        if self.max_bytes and self.written > self.max_bytes:
+            raise RequestEntityTooLarge(f"Uploaded file exceeds the {self.max_bytes} byte limit")
+        return super().write(s)
+
+
+class UploadRequest(Request):
+    """Request that streams file uploads into size-capped spools under ``UPLOAD_FOLDER``."""
+
+    def _get_file_stream(self, total_content_length, content_type, filename=None, content_length=None):
+        if content_length is not None and UPLOAD_MAX_BYTES and content_length > UPLOAD_MAX_BYTES:
+            raise RequestEntityTooLarge(f"Uploaded file exceeds the {UPLOAD_MAX_BYTES} byte limit")
+        return UploadSpool()
+
+
+def detach_upload(file):
+    """Return a copy of ``file`` that stays readable after the request closes its uploads.
+
+    Uploads that have spilled to disk are handed over by duplicating the file
+    descriptor, so the contents are never copied; small in-memory uploads are
+    copied into a new spool.
+    """
+    stream = file.stream
+    inner = getattr(stream, '_file', stream)
+    if not isinstance(inner, io.BytesIO):
+        try:
+            handle = os.fdopen(os.dup(inner.fileno()), 'rb')
+            handle.seek(0)
+            return FileStorage(stream=handle, filename=file.filename, content_type=file.content_type)
+        except (AttributeError, OSError, io.UnsupportedOperation):
+            pass
+
+    spool = UploadSpool(max_bytes=0)
+    stream.seek(0)
+    shutil.copyfileobj(stream, spool, COPY_CHUNK_SIZE)
+    spool.seek(0)
+    return FileStorage(stream=spool, filename=file.filename, content_type=file.content_type)
+
+
+def upload_sha256(file):
+    """Return the hex SHA-256 of an upload's contents, leaving the stream at the start."""
+    digest = hashlib.sha256()
+    stream = file.stream
+    stream.seek(0)
+    for chunk in iter(lambda: stream.read(COPY_CHUNK_SIZE), b''):
+        digest.update(chunk)
+    stream.seek(0)
+    return digest.hexdigest()
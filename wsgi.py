@@ -0,0 +1,7 @@
+"""Production entry point: ``gunicorn -c gunicorn.conf.py wsgi:app``."""
+# app loads .env before anything reads its settings, so it is imported first
+from app import app
+from extractors import preload_backends
+
+# Import the parser libraries up front so preforked workers share them
+preload_backends()